@@ -1,81 +1,70 @@
-MARKET_TO_EPIC = {
-    # US Tech
-    "US Tech": "IX.D.NASDAQ.IFS.IP",
-    "USTECH": "IX.D.NASDAQ.IFS.IP",
-
-    # US 500
-    "US 500": "IX.D.SPTRD.IFS.IP",
-    "US500": "IX.D.SPTRD.IFS.IP",
-
-    # Wall Street
-    "Wall Street": "IX.D.DOW.IFS.IP",
-    "WALL": "IX.D.DOW.IFS.IP",
+import re
 
-    # Germany 30
-    "Germany 30": "IX.D.DAX.IFS.IP",
-    "DE30": "IX.D.DAX.IFS.IP",
+from market_trie import RadixTrie
 
-    # Germany 40
-    "Germany 40": "IX.D.DAX.IFS.IP",
-    "DE30": "IX.D.DAX.IFS.IP",
+_NON_WORD_RE = re.compile(r'\W+')
 
-    # Japan 225
-    "Japan 225": "IX.D.NIKKEI.IFM.IP",
-    "JP225": "IX.D.NIKKEI.IFM.IP",
 
-    # FTSE 100
-    "FTSE 100": "IX.D.FTSE.IFM.IP",
-    "FT100": "IX.D.FTSE.IFM.IP",
+def normalize_market_name(name):
+    """Normalise a market name for lookups: upper case, letters, digits and '_' only"""
+    return _NON_WORD_RE.sub('', name).upper()
 
-    # EU Stocks 50
-    "EU Stocks 50": "IX.D.STXE.IFM.IP",
-    "EU50": "IX.D.STXE.IFM.IP",
+# (canonical name, aliases, epic) - aliases only need listing when they
+# differ from the canonical name after normalisation
+_ENTRIES = [
+    # US indices
+    ("US Tech", (), "IX.D.NASDAQ.IFS.IP"),
+    ("US 500", (), "IX.D.SPTRD.IFS.IP"),
+    ("Wall Street", ("WALL",), "IX.D.DOW.IFS.IP"),
 
-    # France 40
-    "France 40": "IX.D.CAC.IFS.IP",
-    "FR40": "IX.D.CAC.IFS.IP",
-
-    # Australia 200
-    "Australia 200": "IX.D.ASX.IFS.IP",
-    "AU200": "IX.D.ASX.IFS.IP",
+    # European and Asian indices
+    ("Germany 40", ("Germany 30", "DE30"), "IX.D.DAX.IFS.IP"),
+    ("Japan 225", ("JP225",), "IX.D.NIKKEI.IFM.IP"),
+    ("FTSE 100", ("FT100",), "IX.D.FTSE.IFM.IP"),
+    ("EU Stocks 50", ("EU50",), "IX.D.STXE.IFM.IP"),
+    ("France 40", ("FR40",), "IX.D.CAC.IFS.IP"),
+    ("Australia 200", ("AU200",), "IX.D.ASX.IFS.IP"),
 
     # Commodities
-    "Oil": "CC.D.CL.UMP.IP",
-    "CL": "CC.D.CL.UMP.IP",
-    "Gold": "CS.D.CFPGOLD.CFP.IP",
-    "GC": "CS.D.CFPGOLD.CFP.IP",
-    "Silver": "CS.D.CFDSILVER.CFM.IP",
-    "SI": "CS.D.CFDSILVER.CFM.IP",
+    ("Oil", ("CL",), "CC.D.CL.UMP.IP"),
+    ("Gold", ("GC",), "CS.D.CFPGOLD.CFP.IP"),
+    ("Silver", ("SI",), "CS.D.CFDSILVER.CFM.IP"),
 
     # Forex
-    "EUR/USD": "CS.D.EURUSD.MINI.IP",
-    "EURUSD": "CS.D.EURUSD.MINI.IP",
-    "GBP/USD": "CS.D.GBPUSD.MINI.IP",
-    "GBPUSD": "CS.D.GBPUSD.MINI.IP",
-    "USD/JPY": "CS.D.USDJPY.MINI.IP",
-    "USDJPY": "CS.D.USDJPY.MINI.IP",
-    "EUR/JPY": "CS.D.EURJPY.MINI.IP",
-    "EURJPY": "CS.D.EURJPY.MINI.IP",
-    "AUD/USD": "CS.D.AUDUSD.MINI.IP",
-    "AUDUSD": "CS.D.AUDUSD.MINI.IP",
-    "GBP/JPY": "CS.D.GBPJPY.MINI.IP",
-    "GBPJPY": "CS.D.GBPJPY.MINI.IP",
-    "USD/CHF": "CS.D.USDCHF.MINI.IP",
-    "USDCHF": "CS.D.USDCHF.MINI.IP",
-    "USD/CAD": "CS.D.USDCAD.MINI.IP",
-    "USDCAD": "CS.D.USDCAD.MINI.IP",
-    "EUR/GBP": "CS.D.EURGBP.MINI.IP",
-    "EURGBP": "CS.D.EURGBP.MINI.IP",
+    ("EUR/USD", (), "CS.D.EURUSD.MINI.IP"),
+    ("GBP/USD", (), "CS.D.GBPUSD.MINI.IP"),
+    ("USD/JPY", (), "CS.D.USDJPY.MINI.IP"),
+    ("EUR/JPY", (), "CS.D.EURJPY.MINI.IP"),
+    ("AUD/USD", (), "CS.D.AUDUSD.MINI.IP"),
+    ("GBP/JPY", (), "CS.D.GBPJPY.MINI.IP"),
+    ("USD/CHF", (), "CS.D.USDCHF.MINI.IP"),
+    ("USD/CAD", (), "CS.D.USDCAD.MINI.IP"),
+    ("EUR/GBP", (), "CS.D.EURGBP.MINI.IP"),
 
     # Other indices
-    "Netherlands 25": "IX.D.AEX.IFM.IP",
-    "NL25": "IX.D.AEX.IFM.IP",
-    "Hong Kong HS50": "IX.D.HANGSENG.IFU.IP",
-    "HS34": "IX.D.HANGSENG.IFU.IP",
-    "Sweden 30": "IX.D.OMX.IFM.IP",
-    "Sweden 30": "IX.D.OMX.IFM.IP",
-    "OMX": "IX.D.OMX.IFM.IP",
-    "SE30": "IX.D.OMX.IFM.IP",
-    "Spain 35": "IX.D.IBEX.IFM.IP",
-    "ES35": "IX.D.IBEX.IFM.IP",
-    }
+    ("Netherlands 25", ("NL25",), "IX.D.AEX.IFM.IP"),
+    ("Hong Kong HS50", ("HS34",), "IX.D.HANGSENG.IFU.IP"),
+    ("Sweden 30", ("OMX", "SE30"), "IX.D.OMX.IFM.IP"),
+    ("Spain 35", ("ES35",), "IX.D.IBEX.IFM.IP"),
+]
+
+# Normalised market name -> epic
+MARKET_TO_EPIC = {
+    normalize_market_name(name): epic
+    for canonical, aliases, epic in _ENTRIES
+    for name in (canonical, *aliases)
+}
+
+
+def epic_for(name):
+    """Look up the epic for a market name or alias, ignoring case, spaces and punctuation"""
+    return MARKET_TO_EPIC.get(normalize_market_name(name))
+
+
+def build_market_trie():
+    """Build a radix trie of normalised market names for prefix search"""
+    trie = RadixTrie()
+    for canonical, aliases, epic in _ENTRIES:
+        for name in (canonical, *aliases):
+            trie.insert(normalize_market_name(name), (canonical, epic))
+    return trie
@@ -1,14 +1,38 @@
 import requests
-import json
+import orjson
 import logging
-from datetime import datetime, timedelta
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 logger = logging.getLogger(__name__)
 
+# Upper bound on the number of epics kept in the market details cache
+MARKET_DETAILS_CACHE_SIZE = 256
+# Refresh the access token this many seconds before it expires
+TOKEN_EXPIRY_MARGIN = 15
+# Minimum interval in seconds between token expiry checks
+TOKEN_CHECK_INTERVAL = 0.5
+# Seconds to wait for IG to respond before giving up on a request
+REQUEST_TIMEOUT = 5.0
+# Maximum number of concurrent market details requests (kept below pool_maxsize)
+MAX_FETCH_WORKERS = 8
+
+def _json(response):
+    """Decode a JSON response body with orjson"""
+    return orjson.loads(response.content)
+
 class IGAPIError(Exception):
     """Custom exception for IG API errors"""
     pass
 
+class IGAuthError(IGAPIError):
+    """Raised when the session is missing, expired or rejected and a new login is needed"""
+    pass
+
 class IGClient:
     def __init__(self, api_key, username, password):
         self.api_key = api_key
@@ -16,49 +40,163 @@ class IGClient:
         self.password = password
         self.base_url = "https://demo-api.ig.com/gateway/deal"
         self.session = requests.Session()
+        # Every call goes to the same host, so keep one pooled keep-alive
+        # connection set and retry transient gateway errors transparently
+        adapter = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=32,
+            max_retries=Retry(
+                total=3,
+                backoff_factor=0.3,
+                status_forcelist=(429, 502, 503, 504),
+                allowed_methods=frozenset(["GET", "POST"])
+            )
+        )
+        self.session.mount("https://", adapter)
+        self.session.headers.update({
+            "X-IG-API-KEY": api_key,
+            "Accept": "application/json; charset=UTF-8"
+        })
         self.account_id = None
         self.access_token = None
         self.refresh_token = None
-        self.token_expiry = None
+        # time.monotonic() deadline after which the token must be refreshed
+        self._token_expiry_monotonic = None
+        self._last_token_check = 0.0
+        # API version -> authenticated request headers, rebuilt only when the token changes
+        self._auth_headers = {}
+        # epic -> (fetch time, market details), oldest entries first
+        self._md_cache = OrderedDict()
+        self._md_cache_lock = threading.Lock()
 
-    def login(self):
-        """Authenticate with the IG API"""
-        headers = {
-            "X-IG-API-KEY": self.api_key,
-            "Content-Type": "application/json",
-            "Accept": "application/json; charset=UTF-8",
-            "Version": "3"
+    def _cache_auth_headers(self):
+        """Build the authenticated headers once per access token"""
+        auth_headers = {
+            "Authorization": f"Bearer {self.access_token}",
+            "IG-ACCOUNT-ID": self.account_id
         }
+        self._auth_headers = {
+            version: {**auth_headers, "Version": version}
+            for version in ("1", "2", "3")
+        }
+
+    def _clear_session(self):
+        """Drop tokens and cached headers so the next call requires a new login"""
+        self.access_token = None
+        self.refresh_token = None
+        self._token_expiry_monotonic = None
+        self._auth_headers = {}
+        with self._md_cache_lock:
+            self._md_cache.clear()
+
+    def invalidate(self, epic=None):
+        """
+        Drop cached market details, e.g. after a trade on that market
+
+        Args:
+            epic: The epic to invalidate, or None to clear the whole cache
+        """
+        with self._md_cache_lock:
+            if epic is None:
+                self._md_cache.clear()
+            else:
+                self._md_cache.pop(epic, None)
+
+    def _cached_market_details(self, epic, max_age):
+        """Return cached market details younger than max_age seconds, or None"""
+        with self._md_cache_lock:
+            cached = self._md_cache.get(epic)
+            if cached is None or time.monotonic() - cached[0] >= max_age:
+                return None
+            self._md_cache.move_to_end(epic)
+            return cached[1]
+
+    def _store_market_details(self, epic, details):
+        """Cache market details for an epic, evicting the least recently used entry"""
+        with self._md_cache_lock:
+            self._md_cache[epic] = (time.monotonic(), details)
+            self._md_cache.move_to_end(epic)
+            if len(self._md_cache) > MARKET_DETAILS_CACHE_SIZE:
+                self._md_cache.popitem(last=False)
+
+    def _request(self, method, path, *, version, action, params=None, body=None,
+                 authed=True, timeout=REQUEST_TIMEOUT):
+        """
+        Send a request to the IG API and decode the JSON response
+
+        Args:
+            method: HTTP method
+            path: Path relative to the gateway base URL
+            version: IG API version header value
+            action: Description of the call used in log and error messages
+            params: Optional query string parameters
+            body: Optional JSON-serialisable request body
+            authed: Whether the call needs the session's access token
+            timeout: Seconds to wait for a response
+
+        Returns:
+            dict: The decoded response body
+
+        Raises:
+            IGAuthError: If there is no valid session or the credentials are rejected
+            IGAPIError: On network errors, unexpected status codes or invalid responses
+        """
+        if authed:
+            self.ensure_token_valid()
+            headers = self._auth_headers.get(version)
+            if headers is None:
+                # Another thread cleared the session after the token check
+                raise IGAuthError("No valid session - needs new login")
+        else:
+            headers = {"Content-Type": "application/json", "Version": version}
 
         try:
-            response = self.session.post(
-                f"{self.base_url}/session",
+            response = self.session.request(
+                method,
+                self.base_url + path,
                 headers=headers,
-                json={"identifier": self.username, "password": self.password}
+                params=params,
+                data=orjson.dumps(body) if body is not None else None,
+                timeout=timeout
             )
 
             if response.status_code == 200:
-                response_data = response.json()
-                self.account_id = response_data.get('accountId')
-                oauth_token = response_data.get('oauthToken', {})
-                self.access_token = oauth_token.get('access_token')
-                self.refresh_token = oauth_token.get('refresh_token')
-                expires_in = int(oauth_token.get('expires_in', 0))
-                self.token_expiry = datetime.now() + timedelta(seconds=expires_in)
-                logger.info("Successfully authenticated with IG API")
-                return True
+                return _json(response)
             elif response.status_code == 401:
-                logger.error("Authentication failed - invalid credentials")
-                raise IGAPIError("Invalid credentials provided")
+                if authed:
+                    logger.error("Token expired or invalid while %s", action)
+                    self._clear_session()
+                    raise IGAuthError("Session expired - needs new login")
+                logger.error("Authentication failed while %s - invalid credentials", action)
+                raise IGAuthError("Invalid credentials provided")
             else:
-                logger.error(f"Authentication failed with status code: {response.status_code}")
-                raise IGAPIError("Failed to authenticate with IG API")
+                logger.error("Failed %s: HTTP %s", action, response.status_code)
+                raise IGAPIError(f"Failed {action} with IG API: HTTP {response.status_code}")
         except requests.exceptions.RequestException as e:
-            logger.error(f"Network error during authentication: {str(e)}")
-            raise IGAPIError("Network error occurred while connecting to IG API")
-        except Exception as e:
-            logger.error(f"Unexpected error during authentication: {str(e)}")
-            raise IGAPIError("An unexpected error occurred during authentication")
+            logger.error("Network error while %s: %s", action, e)
+            raise IGAPIError(f"Network error occurred while {action}")
+        except ValueError as e:
+            logger.error("Invalid response while %s: %s", action, e)
+            raise IGAPIError(f"Invalid response received while {action}")
+
+    def login(self):
+        """Authenticate with the IG API"""
+        response_data = self._request(
+            "POST", "/session",
+            version="3",
+            action="authenticating",
+            body={"identifier": self.username, "password": self.password},
+            authed=False
+        )
+        self.account_id = response_data.get('accountId')
+        oauth_token = response_data.get('oauthToken', {})
+        self.access_token = oauth_token.get('access_token')
+        self.refresh_token = oauth_token.get('refresh_token')
+        expires_in = int(oauth_token.get('expires_in', 0))
+        self._token_expiry_monotonic = time.monotonic() + expires_in - TOKEN_EXPIRY_MARGIN
+        self._cache_auth_headers()
+        logger.info("Successfully authenticated with IG API")
+        return True
 
     def refresh_access_token(self):
         """Refresh the access token using the refresh token"""
@@ -66,132 +204,147 @@ class IGClient:
             logger.error("No refresh token available")
             return False
 
-        headers = {
-            "X-IG-API-KEY": self.api_key,
-            "Content-Type": "application/json",
-            "Accept": "application/json; charset=UTF-8",
-            "Version": "1"
-        }
-
         try:
-            response = self.session.post(
-                f"{self.base_url}/session/refresh-token",
-                headers=headers,
-                json={"refresh_token": self.refresh_token}
+            response_data = self._request(
+                "POST", "/session/refresh-token",
+                version="1",
+                action="refreshing access token",
+                body={"refresh_token": self.refresh_token},
+                authed=False
             )
-
-            if response.status_code == 200:
-                response_data = response.json()
-                self.access_token = response_data.get('access_token')
-                self.refresh_token = response_data.get('refresh_token')
-                expires_in = int(response_data.get('expires_in', 0))
-                self.token_expiry = datetime.now() + timedelta(seconds=expires_in)
-                logger.info("Successfully refreshed access token")
-                return True
-            else:
-                logger.error(f"Failed to refresh token: {response.status_code}")
-                return False
-        except Exception as e:
-            logger.error(f"Error refreshing token: {str(e)}")
+        except IGAPIError:
             return False
 
+        self.access_token = response_data.get('access_token')
+        self.refresh_token = response_data.get('refresh_token')
+        expires_in = int(response_data.get('expires_in', 0))
+        self._token_expiry_monotonic = time.monotonic() + expires_in - TOKEN_EXPIRY_MARGIN
+        self._cache_auth_headers()
+        logger.info("Successfully refreshed access token")
+        return True
+
     def ensure_token_valid(self):
         """Ensure the access token is valid, refresh if needed"""
-        if not self.token_expiry or not self.access_token:
-            raise IGAPIError("No valid session - needs new login")
+        if self._token_expiry_monotonic is None or not self.access_token:
+            raise IGAuthError("No valid session - needs new login")
+
+        now = time.monotonic()
+        if now - self._last_token_check < TOKEN_CHECK_INTERVAL:
+            return
+        self._last_token_check = now
 
-        # Refresh if token expires in less than 15 seconds
-        if datetime.now() + timedelta(seconds=15) >= self.token_expiry:
+        # Refresh if token expires in less than TOKEN_EXPIRY_MARGIN seconds
+        if now >= self._token_expiry_monotonic:
             logger.info("Token expiring soon, attempting refresh...")
             success = self.refresh_access_token()
             if not success:
-                self.access_token = None
-                self.refresh_token = None
-                self.token_expiry = None
-                raise IGAPIError("Session expired - needs new login")
-            
+                self._clear_session()
+                raise IGAuthError("Session expired - needs new login")
+
     def get_positions(self):
         """Fetch current positions"""
-        try:
-            self.ensure_token_valid()
-            if not self.access_token:
-                raise IGAPIError("Not authenticated - please log in first")
-
-            headers = {
-                "X-IG-API-KEY": self.api_key,
-                "Authorization": f"Bearer {self.access_token}",
-                "IG-ACCOUNT-ID": self.account_id,
-                "Content-Type": "application/json",
-                "Accept": "application/json; charset=UTF-8",
-                "Version": "1"
-            }
-
-            response = self.session.get(
-                f"{self.base_url}/positions",
-                headers=headers
-            )
+        positions = self._request("GET", "/positions", version="1", action="fetching positions")
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("Successfully fetched positions")
+        return positions
 
-            if response.status_code == 200:
-                logger.info("Successfully fetched positions")
-                return response.json()
-            elif response.status_code == 401:
-                # Clear tokens and raise error
-                self.access_token = None
-                self.refresh_token = None
-                self.token_expiry = None
-                raise IGAPIError("Session expired - needs new login")
-            else:
-                logger.error(f"Failed to fetch positions: HTTP {response.status_code}")
-                raise IGAPIError("Failed to fetch positions from IG API")
-        except requests.exceptions.RequestException as e:
-            logger.error(f"Network error while fetching positions: {str(e)}")
-            raise IGAPIError("Network error occurred while fetching positions")
-        except Exception as e:
-            logger.error(f"Unexpected error while fetching positions: {str(e)}")
-            raise IGAPIError("An unexpected error occurred while fetching positions")
-        
-    def get_market_details(self, epic):
+    def get_market_details(self, epic, max_age=2.0):
         """
         Fetch details for a specific market by its epic code
 
         Args:
             epic: The epic identifier for the market
+            max_age: Maximum age in seconds of a cached response that may be reused
 
         Returns:
             dict: Market details including current price, underlying info, etc.
         """
-        self.ensure_token_valid()
-        if not self.access_token:
-            logger.error("Attempted to fetch market details without being logged in")
-            raise IGAPIError("Not authenticated - please log in first")
+        cached = self._cached_market_details(epic, max_age)
+        if cached is not None:
+            return cached
 
-        headers = {
-            "X-IG-API-KEY": self.api_key,
-            "Authorization": f"Bearer {self.access_token}",
-            "IG-ACCOUNT-ID": self.account_id,
-            "Content-Type": "application/json",
-            "Accept": "application/json; charset=UTF-8",
-            "Version": "3"
-        }
+        details = self._request("GET", f"/markets/{epic}", version="3", action="fetching market details")
+        self._store_market_details(epic, details)
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("Successfully fetched market details")
+        return details
 
-        try:
-            response = self.session.get(
-                f"{self.base_url}/markets/{epic}",
-                headers=headers
+    def get_markets_bulk(self, epics, max_age=2.0, chunk_size=50):
+        """
+        Fetch details for several markets using the multi-epic endpoint
+
+        Args:
+            epics: Iterable of epic identifiers
+            max_age: Maximum age in seconds of a cached response that may be reused
+            chunk_size: Maximum number of epics per request (IG accepts up to 50)
+
+        Returns:
+            dict: Market details keyed by epic
+        """
+        details_by_epic = {}
+        missing = []
+        for epic in dict.fromkeys(epics):
+            cached = self._cached_market_details(epic, max_age)
+            if cached is not None:
+                details_by_epic[epic] = cached
+            else:
+                missing.append(epic)
+
+        def fetch_chunk(chunk):
+            return self._request(
+                "GET", "/markets",
+                version="2",
+                action="fetching market details",
+                params={"epics": ",".join(chunk), "filter": "ALL"}
             )
 
-            if response.status_code == 200:
-                logger.info("Successfully fetched market details")
-                return response.json()
-            elif response.status_code == 401:
-                logger.error("Token expired or invalid")
-                raise IGAPIError("Session expired - please log in again")
+        chunks = [missing[i:i + chunk_size] for i in range(0, len(missing), chunk_size)]
+        if len(chunks) > 1:
+            # Books spanning several chunks: overlap the requests rather than paying one RTT each
+            self.ensure_token_valid()
+            with ThreadPoolExecutor(max_workers=min(MAX_FETCH_WORKERS, len(chunks))) as executor:
+                responses = list(executor.map(fetch_chunk, chunks))
+        else:
+            responses = [fetch_chunk(chunk) for chunk in chunks]
+
+        for response_data in responses:
+            for details in response_data.get('marketDetails', []):
+                epic = details['instrument']['epic']
+                self._store_market_details(epic, details)
+                details_by_epic[epic] = details
+
+        if missing:
+            logger.info("Successfully fetched details for %d markets", len(missing))
+        return details_by_epic
+
+    def get_market_details_many(self, epics, max_age=2.0):
+        """
+        Fetch details for several markets concurrently, one request per epic
+
+        Used when the multi-epic endpoint is unavailable. Cached epics are
+        returned without issuing a request.
+
+        Args:
+            epics: Iterable of epic identifiers
+            max_age: Maximum age in seconds of a cached response that may be reused
+
+        Returns:
+            dict: Market details keyed by epic
+        """
+        details_by_epic = {}
+        missing = []
+        for epic in dict.fromkeys(epics):
+            cached = self._cached_market_details(epic, max_age)
+            if cached is not None:
+                details_by_epic[epic] = cached
             else:
-                logger.error(f"Failed to fetch market details: HTTP {response.status_code}")
-                raise IGAPIError(f"Failed to fetch market details from IG API: HTTP {response.status_code}")
-        except requests.exceptions.RequestException as e:
-            logger.error(f"Network error while fetching market details: {str(e)}")
-            raise IGAPIError("Network error occurred while fetching market details")
-        except Exception as e:
-            logger.error(f"Unexpected error while fetching market details: {str(e)}")
-            raise IGAPIError("An unexpected error occurred while fetching market details")
\ No newline at end of file
+                missing.append(epic)
+
+        if missing:
+            # Refresh the token up front rather than racing to do it from every worker
+            self.ensure_token_valid()
+            with ThreadPoolExecutor(max_workers=min(MAX_FETCH_WORKERS, len(missing))) as executor:
+                details_by_epic.update(zip(missing, executor.map(
+                    lambda epic: self.get_market_details(epic, max_age), missing)))
+
+        return details_by_epic
@@ -1,23 +1,48 @@
 import streamlit as st
-import json
+import orjson
 import logging
+import logging.handlers
 import sys
 from datetime import datetime
-from ig_api import IGClient, IGAPIError
+from ig_api import IGClient, IGAPIError, IGAuthError
 from utils import format_positions
 from options_processor import OptionsProcessor
-
-# Enhanced logging configuration
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.StreamHandler(sys.stdout),
-        logging.FileHandler('app.log')
-    ]
-)
+from epic_mapping import build_market_trie, normalize_market_name
+
+# Enhanced logging configuration, installed once per process since
+# Streamlit re-executes this module on every rerun
+if not logging.getLogger().handlers:
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        handlers=[
+            logging.StreamHandler(sys.stdout),
+            logging.handlers.RotatingFileHandler('app.log', maxBytes=5_000_000, backupCount=3)
+        ]
+    )
 logger = logging.getLogger(__name__)
 
+# Display formats for the percentage columns of the positions table
+POSITION_COLUMN_CONFIG = {
+    "change": st.column_config.NumberColumn(format="%.2f%%"),
+    "volatility": st.column_config.NumberColumn(format="%.2f%%"),
+    "interest_rate": st.column_config.NumberColumn(format="%.2f%%")
+}
+
+@st.cache_resource(show_spinner="Logging in...")
+def get_client(api_key, username, password):
+    """Log in once per credentials and share the client (and its connection pool) across sessions"""
+    client = IGClient(api_key, username, password)
+    client.login()
+    return client
+
+
+@st.cache_resource(show_spinner=False)
+def get_processor(api_key, username, password):
+    """Build one options processor per credentials and share it (and its caches) across sessions"""
+    return OptionsProcessor(get_client(api_key, username, password))
+
+
 def init_session_state():
     if 'logged_in' not in st.session_state:
         st.session_state.logged_in = False
@@ -25,19 +50,21 @@ def init_session_state():
         st.session_state.api_key = ''
     if 'positions' not in st.session_state:
         st.session_state.positions = None
-    if 'client' not in st.session_state:
-        st.session_state.client = None
+    if 'positions_hash' not in st.session_state:
+        st.session_state.positions_hash = None
+    if 'credentials' not in st.session_state:
+        st.session_state.credentials = None
     if 'stream' not in st.session_state:
         st.session_state.stream = False
-    if 'options_processor' not in st.session_state:
-        st.session_state.options_processor = None
 
 
 def logout():
     st.session_state.logged_in = False
     st.session_state.positions = None
-    st.session_state.client = None
-    st.session_state.options_processor = None
+    st.session_state.positions_hash = None
+    st.session_state.credentials = None
+    get_client.clear()
+    get_processor.clear()
     st.rerun()
 
 
@@ -45,6 +72,11 @@ def toggle_streaming():
     st.session_state.stream = not st.session_state.stream
 
 
+@st.cache_resource
+def get_market_trie():
+    return build_market_trie()
+
+
 def main():
     st.set_page_config(page_title="IG Trading API Client",
                        page_icon="📈",
@@ -70,16 +102,11 @@ def main():
 
             if st.button("Login", use_container_width=True):
                 try:
-                    client = IGClient(api_key, username, password)
-                    success = client.login()
-                    if success:
-                        st.session_state.client = client
-                        st.session_state.options_processor = OptionsProcessor(client)
-                        st.session_state.logged_in = True
-                        st.success("Successfully logged in!")
-                        st.rerun()
-                    else:
-                        st.error("Login failed. Please check your credentials.")
+                    get_client(api_key, username, password)
+                    st.session_state.credentials = (api_key, username, password)
+                    st.session_state.logged_in = True
+                    st.success("Successfully logged in!")
+                    st.rerun()
                 except Exception as e:
                     st.error(f"Error during login: {str(e)}")
         else:
@@ -93,11 +120,21 @@ def main():
             st.button("Start streaming", disabled=st.session_state.stream, on_click=toggle_streaming)
             st.button("Stop streaming", disabled=not st.session_state.stream, on_click=toggle_streaming)
 
+            # Market lookup by name prefix
+            st.header("Market Lookup")
+            query = st.text_input("Market", placeholder="e.g. Germany")
+            matches = list(dict.fromkeys(get_market_trie().iter_prefix(normalize_market_name(query))))
+            if matches:
+                market = st.selectbox("Matches", matches, format_func=lambda m: m[0])
+                st.caption(f"Epic: {market[1]}")
+            else:
+                st.caption("No matching markets")
+
             # Logout button
             st.button("Logout", on_click=logout, use_container_width=True)
 
     # Main content area
-    if st.session_state.logged_in and st.session_state.client:
+    if st.session_state.logged_in and st.session_state.credentials:
         # Set up the streaming fragment
         if st.session_state.stream:
             run_every = st.session_state.run_every
@@ -107,27 +144,36 @@ def main():
         @st.fragment(run_every=run_every)
         def show_positions():
             try:
-                positions = st.session_state.client.get_positions()
+                positions = get_client(*st.session_state.credentials).get_positions()
                 if positions:
                     # Process positions with options calculations
-                    processed_positions = st.session_state.options_processor.process_positions(positions)
+                    processed_positions = get_processor(*st.session_state.credentials).process_positions(positions)
                     st.subheader("Current Positions")
                     st.caption(f"Last updated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-                    formatted_positions = format_positions(processed_positions)
-                    st.json(formatted_positions)
+
+                    # Only re-format when the processed data changed since the last tick
+                    positions_hash = hash(orjson.dumps(processed_positions))
+                    if positions_hash != st.session_state.positions_hash:
+                        st.session_state.positions = format_positions(processed_positions)
+                        st.session_state.positions_hash = positions_hash
+
+                    if st.session_state.positions.empty:
+                        st.info("No positions found")
+                    else:
+                        st.dataframe(st.session_state.positions,
+                                     hide_index=True,
+                                     use_container_width=True,
+                                     column_config=POSITION_COLUMN_CONFIG,
+                                     key="positions_table")
                     if st.session_state.stream:
                         logger.info("Positions updated via streaming")
+            except IGAuthError:
+                st.error("Session expired. Please log in again.")
+                logout()  # This will clear the session and force re-login
             except IGAPIError as e:
-                if "Session expired" in str(e) or "needs new login" in str(e):
-                    st.error("Session expired. Please log in again.")
-                    logout()  # This will clear the session and force re-login
-                    st.rerun()
-                else:
-                    st.error(f"Error fetching positions: {str(e)}")
+                st.error(f"Error fetching positions: {str(e)}")
             except Exception as e:
                 st.error(f"Error: {str(e)}")
-                logout()
-                st.rerun()
 
         # Call the fragment
         show_positions()
@@ -0,0 +1,104 @@
+class _Node:
+    __slots__ = ("label", "children", "value", "has_value")
+
+    def __init__(self, label, value=None, has_value=False):
+        self.label = label
+        self.children = {}
+        self.value = value
+        self.has_value = has_value
+
+
+def _common_prefix_length(a, b):
+    n = min(len(a), len(b))
+    i = 0
+    while i < n and a[i] == b[i]:
+        i += 1
+    return i
+
+
+class RadixTrie:
+    """Compressed prefix tree mapping string keys to values"""
+
+    def __init__(self):
+        self._root = _Node("")
+
+    def insert(self, key, value):
+        """
+        Insert a key, replacing the value if the key is already present
+
+        Args:
+            key: The string key
+            value: The value stored for the key
+        """
+        node = self._root
+        while key:
+            child = node.children.get(key[0])
+            if child is None:
+                node.children[key[0]] = _Node(key, value, True)
+                return
+
+            common = _common_prefix_length(child.label, key)
+            if common < len(child.label):
+                # Split the edge so the shared part becomes its own node
+                split = _Node(child.label[:common])
+                child.label = child.label[common:]
+                split.children[child.label[0]] = child
+                node.children[key[0]] = split
+                child = split
+
+            node = child
+            key = key[common:]
+
+        node.value = value
+        node.has_value = True
+
+    def find(self, key):
+        """
+        Look up the value for an exact key
+
+        Args:
+            key: The string key
+
+        Returns:
+            The stored value, or None if the key is not present
+        """
+        node = self._root
+        while key:
+            child = node.children.get(key[0])
+            if child is None or not key.startswith(child.label):
+                return None
+            node = child
+            key = key[len(child.label):]
+        return node.value if node.has_value else None
+
+    def iter_prefix(self, prefix):
+        """
+        Iterate over the values of all keys starting with a prefix, in key order
+
+        Args:
+            prefix: The key prefix; an empty prefix yields every value
+
+        Yields:
+            The stored values
+        """
+        node = self._root
+        while prefix:
+            child = node.children.get(prefix[0])
+            if child is None:
+                return
+            if len(prefix) <= len(child.label):
+                if not child.label.startswith(prefix):
+                    return
+                node = child
+                break
+            if not prefix.startswith(child.label):
+                return
+            node = child
+            prefix = prefix[len(child.label):]
+
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            if node.has_value:
+                yield node.value
+            stack.extend(node.children[c] for c in sorted(node.children, reverse=True))
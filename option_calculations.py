@@ -1,5 +1,23 @@
 import math
-from typing import Literal, Union
+from enum import IntEnum
+from typing import Optional, Tuple, Union
+
+# Bracket the implied volatility search is confined to
+IV_LOWER_BOUND = 1e-6
+IV_UPPER_BOUND = 5.0
+
+_INV_SQRT_2 = 1 / math.sqrt(2)
+_INV_SQRT_2PI = 1 / math.sqrt(2*math.pi)
+
+class OptionType(IntEnum):
+    """Option type, valued as the sign of its payoff in the underlying"""
+    CALL = 1
+    PUT = -1
+
+class Direction(IntEnum):
+    """Trade direction, valued as the sign it applies to the position's delta"""
+    BUY = 1
+    SELL = -1
 
 def std_norm_cdf(x: float) -> float:
     """
@@ -11,7 +29,8 @@ def std_norm_cdf(x: float) -> float:
     Returns:
         The probability that a standard normal random variable will be less than or equal to x
     """
-    return 0.5 * (1 + math.erf(x / math.sqrt(2)))
+    # erfc(-x) == 1 + erf(x), without the cancellation in the lower tail
+    return 0.5 * math.erfc(-x * _INV_SQRT_2)
 
 def std_norm_pdf(x: float) -> float:
     """
@@ -23,7 +42,7 @@ def std_norm_pdf(x: float) -> float:
     Returns:
         The height of the probability density function at x
     """
-    return math.exp(-x*x/2.0) / math.sqrt(2*math.pi)
+    return math.exp(-x*x/2.0) * _INV_SQRT_2PI
 
 def get_w(s: float, k: float, t: float, v: float, r: float) -> float:
     """
@@ -39,40 +58,57 @@ def get_w(s: float, k: float, t: float, v: float, r: float) -> float:
     Returns:
         The W parameter for the Black-Scholes formula
     """
-    try:
-        return (math.log(s/k) + (r + (v*v)/2)*t) / (v * math.sqrt(t))
-    except (ValueError, ZeroDivisionError):
-        return float('inf') if s > k else float('-inf')
+    denominator = v * math.sqrt(t) if t > 0 else 0.0
+    if s <= 0 or k <= 0 or denominator == 0:
+        return math.inf if s > k else -math.inf
+    return (math.log(s/k) + (r + (v*v)/2)*t) / denominator
 
-def _call_price(s: float, k: float, t: float, v: float, r: float) -> float:
+def _bs_price_core(log_moneyness: float, discount: float, sqrt_t: float,
+                   s: float, k: float, v: float, call_put: OptionType) -> Tuple[float, float]:
     """
-    Calculate the theoretical price of a call option using Black-Scholes.
+    Calculate a Black-Scholes price from quantities precomputed once per solve,
+    leaving only v * sqrt(t) and the two normal CDFs to evaluate per volatility.
 
     Args:
-        s: Current price of the underlying
-        k: Strike price
-        t: Time to expiration in years
-        v: Volatility as a decimal
-        r: Annual risk-free interest rate as a decimal
+        log_moneyness: log(s/k) + r*t, i.e. log(s / (k*discount))
+        discount: Discount factor exp(-r*t)
+        sqrt_t: Square root of the time to expiration in years (positive)
+        s: Current price of the underlying (positive)
+        k: Strike price (positive)
+        v: Volatility as a decimal (positive)
+        call_put: Option type - OptionType.CALL or OptionType.PUT
 
     Returns:
-        The theoretical price of the call option
+        Tuple of (option price, W parameter), W being reusable for vega
     """
-    if t <= 0:
-        return max(0.0, s - k)
+    denominator = v * sqrt_t
+    # (log(s/k) + (r + v*v/2)*t) / (v*sqrt(t)), with the v-independent part hoisted
+    w = log_moneyness / denominator + 0.5 * denominator
+    call = s * std_norm_cdf(w) - k * discount * std_norm_cdf(w - denominator)
+    if call_put == OptionType.CALL:
+        return call, w
+    return call - s + k * discount, w
+
+def _call_vega_core(s: float, sqrt_t: float, w: float) -> float:
+    """
+    Calculate the option vega from a precomputed sqrt(t) and W parameter.
 
-    w = get_w(s, k, t, v, r)
-    if not math.isfinite(w):
-        return max(0.0, s - k)
+    Args:
+        s: Current price of the underlying
+        sqrt_t: Square root of the time to expiration in years
+        w: The W parameter for the Black-Scholes formula
 
-    d1 = w
-    d2 = w - v * math.sqrt(t)
+    Returns:
+        The option's vega (sensitivity to volatility changes)
+    """
+    if not math.isfinite(w):
+        return 0.0
 
-    return s * std_norm_cdf(d1) - k * math.exp(-r*t) * std_norm_cdf(d2)
+    return s * sqrt_t * std_norm_pdf(w)
 
-def _put_price(s: float, k: float, t: float, v: float, r: float) -> float:
+def _call_price(s: float, k: float, t: float, v: float, r: float) -> float:
     """
-    Calculate the theoretical price of a put option using put-call parity.
+    Calculate the theoretical price of a call option using Black-Scholes.
 
     Args:
         s: Current price of the underlying
@@ -82,13 +118,16 @@ def _put_price(s: float, k: float, t: float, v: float, r: float) -> float:
         r: Annual risk-free interest rate as a decimal
 
     Returns:
-        The theoretical price of the put option
+        The theoretical price of the call option
     """
-    return _call_price(s, k, t, v, r) - s + k * math.exp(-r*t)
+    if t <= 0 or s <= 0 or k <= 0 or v <= 0:
+        return max(0.0, s - k)
+    return _bs_price_core(math.log(s/k) + r*t, math.exp(-r*t), math.sqrt(t),
+                          s, k, v, OptionType.CALL)[0]
 
-def _call_vega(s: float, k: float, t: float, v: float, r: float) -> float:
+def _put_price(s: float, k: float, t: float, v: float, r: float) -> float:
     """
-    Calculate the vega of a call option (same as put vega).
+    Calculate the theoretical price of a put option using put-call parity.
 
     Args:
         s: Current price of the underlying
@@ -98,16 +137,13 @@ def _call_vega(s: float, k: float, t: float, v: float, r: float) -> float:
         r: Annual risk-free interest rate as a decimal
 
     Returns:
-        The option's vega (sensitivity to volatility changes)
+        The theoretical price of the put option
     """
-    if t <= 0:
-        return 0.0
-
-    w = get_w(s, k, t, v, r)
-    if not math.isfinite(w):
-        return 0.0
-
-    return s * math.sqrt(t) * std_norm_pdf(w)
+    discount = math.exp(-r*t)
+    if t <= 0 or s <= 0 or k <= 0 or v <= 0:
+        return max(0.0, s - k) - s + k * discount
+    return _bs_price_core(math.log(s/k) + r*t, discount, math.sqrt(t),
+                          s, k, v, OptionType.PUT)[0]
 
 def _call_delta(s: float, k: float, t: float, v: float, r: float) -> float:
     """
@@ -146,7 +182,7 @@ def _put_delta(s: float, k: float, t: float, v: float, r: float) -> float:
     return 0.0 if delta == -1 and k == s else delta
 
 def get_delta(s: float, k: float, t: float, v: float, r: float, 
-              call_put: Literal["call", "put"], direction: Literal["BUY", "SELL"]) -> float:
+              call_put: OptionType, direction: Direction) -> float:
     """
     Calculate the delta of an option.
 
@@ -156,37 +192,103 @@ def get_delta(s: float, k: float, t: float, v: float, r: float,
         t: Time to expiration in years
         v: Volatility as a decimal
         r: Annual risk-free interest rate as a decimal
-        call_put: The type of option - "call" or "put"
-        direction: The direction of the trade - "BUY" or "SELL"
+        call_put: The type of option - OptionType.CALL or OptionType.PUT
+        direction: The direction of the trade - Direction.BUY or Direction.SELL
 
     Returns:
         The delta of the option, with sign adjusted for trade direction
 
     Examples:
-        >>> get_delta(100, 100, 1, 0.2, 0.05, "call", "BUY")  # Long ATM call
-        0.5398...
-        >>> get_delta(100, 100, 1, 0.2, 0.05, "put", "BUY")   # Long ATM put
-        -0.4602...
-        >>> get_delta(100, 100, 1, 0.2, 0.05, "call", "SELL") # Short ATM call
-        -0.5398...
-    """
-    if call_put == "call":
+        >>> get_delta(100, 100, 1, 0.2, 0.05, OptionType.CALL, Direction.BUY)  # Long ATM call
+        0.6368...
+        >>> get_delta(100, 100, 1, 0.2, 0.05, OptionType.PUT, Direction.BUY)   # Long ATM put
+        -0.3631...
+        >>> get_delta(100, 100, 1, 0.2, 0.05, OptionType.CALL, Direction.SELL) # Short ATM call
+        -0.6368...
+    """
+    if call_put == OptionType.CALL:
         delta = _call_delta(s, k, t, v, r)
     else:  # put
         delta = _put_delta(s, k, t, v, r)
-        
-    # Reverse sign for SELL positions
-    return delta if direction == "BUY" else -delta
+
+    # Direction is -1 for SELL positions, reversing the sign
+    return direction * delta
+
+def get_price_bounds(s: float, k: float, t: float, r: float,
+                     call_put: OptionType) -> Tuple[float, float]:
+    """
+    Calculate the no-arbitrage bounds on an option's price. Vega vanishes at
+    both, so no volatility reproduces a price on or outside them.
+
+    Args:
+        s: Current price of the underlying
+        k: Strike price
+        t: Time to expiration in years
+        r: Annual risk-free interest rate as a decimal
+        call_put: Option type - OptionType.CALL or OptionType.PUT
+
+    Returns:
+        Tuple of (lower, upper): the discounted intrinsic value, and the
+        underlying price for calls or the discounted strike for puts
+    """
+    discounted_k = k * math.exp(-r*t)
+    if call_put == OptionType.CALL:
+        return max(s - discounted_k, 0.0), s
+    return max(discounted_k - s, 0.0), discounted_k
+
+def _iv_initial_guess(s: float, k: float, t: float, r: float,
+                      market_price: float, call_put: OptionType) -> float:
+    """
+    Estimate implied volatility in closed form as the solver's starting point.
+
+    Uses the Corrado-Miller approximation, which is accurate near the money; far
+    from the money its square root term is clamped at zero. If that leaves no
+    positive estimate it falls back to the Manaster-Koehler point where vega
+    peaks, from which Newton converges monotonically.
+
+    Args:
+        s: Current price of the underlying
+        k: Strike price
+        t: Time to expiration in years
+        r: Annual risk-free interest rate as a decimal
+        market_price: Observed market price of the option
+        call_put: Option type - OptionType.CALL or OptionType.PUT
+
+    Returns:
+        The estimated volatility, clamped to [0.01, 3.0]
+    """
+    if t <= 0 or s <= 0 or k <= 0:
+        return 0.3
+
+    discounted_k = k * math.exp(-r*t)
+    # Corrado-Miller is stated for calls; convert puts via put-call parity
+    call = market_price if call_put == OptionType.CALL else market_price + s - discounted_k
+    half_moneyness = (s - discounted_k) / 2
+    radicand = max((call - half_moneyness)**2 - (s - discounted_k)**2 / math.pi, 0.0)
+
+    guess = math.sqrt(2*math.pi/t) / (s + discounted_k) * (call - half_moneyness + math.sqrt(radicand))
+    if not (guess > 0 and math.isfinite(guess)):
+        guess = math.sqrt(2 * abs(math.log(s/k) + r*t) / t)
+
+    return min(max(guess, 0.01), 3.0)
 
 def calculate_implied_volatility(
     s: float, k: float, t: float, r: float, 
-    market_price: float, call_put: Literal["call", "put"],
-    initial_vol: float = 0.3,
+    market_price: float, call_put: OptionType,
+    initial_vol: Optional[float] = None,
     max_iterations: int = 100,
     precision: float = 1.0e-5
 ) -> float:
     """
-    Calculate implied volatility using Newton-Raphson method.
+    Calculate implied volatility using Halley's method safeguarded by bisection.
+
+    The solver iterates on log(price) rather than price: it is far less curved in
+    volatility, so steps stay accurate deep out of the money where vega is tiny
+    (Jaeckel's transform). Halley's third-order step needs only vomma on top of
+    vega, which comes from the same W, so it saves iterations at no extra
+    transcendental cost. The root is kept bracketed in [IV_LOWER_BOUND, IV_UPPER_BOUND]; whenever a
+    step would leave the bracket (or vega vanishes) the solver bisects
+    instead, so it converges for any price the bracket can produce.
 
     Args:
         s: Current price of the underlying
@@ -194,41 +296,73 @@ def calculate_implied_volatility(
         t: Time to expiration in years
         r: Annual risk-free interest rate as a decimal
         market_price: Observed market price of the option
-        call_put: Option type - "call" or "put"
-        initial_vol: Starting guess for volatility
+        call_put: Option type - OptionType.CALL or OptionType.PUT
+        initial_vol: Starting guess for volatility; estimated with
+            _iv_initial_guess if not given
         max_iterations: Maximum number of iterations
-        precision: Desired precision for the result
+        precision: Desired relative precision of the fitted price
 
     Returns:
         float: The implied volatility that produces the market price
 
     Raises:
-        ValueError: If the algorithm fails to converge
+        ValueError: If the price is outside the no-arbitrage bounds (checked
+            before iterating) or the algorithm fails to converge
 
     Example:
         >>> # ATM call option
-        >>> iv = calculate_implied_volatility(100, 100, 1/365, 0, 2.0, "call")
+        >>> iv = calculate_implied_volatility(100, 100, 1/365, 0, 2.0, OptionType.CALL)
         >>> abs(_call_price(100, 100, 1/365, iv, 0) - 2.0) < 1e-4
         True
     """
-    v = initial_vol
-    price_func = _call_price if call_put == "call" else _put_price
+    if t <= 0:
+        raise ValueError(f"Time to expiration must be positive, got {t}")
+    lower, upper = get_price_bounds(s, k, t, r, call_put)
+    if not lower < market_price < upper:
+        raise ValueError(
+            f"Market price {market_price} is outside the no-arbitrage bounds "
+            f"({lower:.4f}, {upper:.4f})"
+        )
+
+    v = initial_vol if initial_vol is not None else _iv_initial_guess(s, k, t, r, market_price, call_put)
+    log_market = math.log(market_price)
+    # s, k, t and r are fixed for the whole solve, so take their transcendentals once
+    sqrt_t = math.sqrt(t)
+    discount = math.exp(-r*t)
+    log_moneyness = math.log(s/k) + r*t
+    lo, hi = IV_LOWER_BOUND, IV_UPPER_BOUND
+    if not lo < v < hi:
+        v = 0.5 * (lo + hi)
 
     for i in range(max_iterations):
-        price = price_func(s, k, t, v, r)
-        diff = price - market_price
+        price, w = _bs_price_core(log_moneyness, discount, sqrt_t, s, k, v, call_put)
+        log_diff = math.log(max(price, 1e-30)) - log_market
 
-        if abs(diff) < precision:
+        if abs(log_diff) < precision:
             return v
 
-        vega = _call_vega(s, k, t, v, r)
-        if abs(vega) < 1e-10:  # Avoid division by zero
-            break
-
-        v = v - diff / vega  # Newton-Raphson update
-
-        if v <= 0:  # Ensure volatility stays positive
-            v = 0.0001
+        # Option prices increase with volatility, so the root is on the far side of v
+        if log_diff < 0:
+            lo = v
+        else:
+            hi = v
+        if hi - lo < precision:
+            if lo > IV_LOWER_BOUND and hi < IV_UPPER_BOUND:
+                return 0.5 * (lo + hi)
+            break  # Collapsed onto a bound: no volatility in range fits the price
+
+        vega = _call_vega_core(s, sqrt_t, w)
+        if abs(vega) >= 1e-10:
+            # Halley update on log-price: its derivative is vega / price, and the
+            # second derivative follows from vomma = vega * d1 * d2 / v at no extra cost
+            slope = vega / price
+            curvature = slope * w * (w - v*sqrt_t) / v - slope * slope
+            v_new = v - 2*log_diff*slope / (2*slope*slope - log_diff*curvature)
+        else:
+            v_new = math.nan
+
+        # Bisect when the step would leave the bracket
+        v = v_new if lo < v_new < hi else 0.5 * (lo + hi)
 
     raise ValueError(
         f"Implied volatility calculation did not converge. "
@@ -0,0 +1,387 @@
+import math
+import numpy as np
+from numba import njit
+from typing import Optional, Tuple, Union
+from option_calculations import OptionType, Direction
+from option_calculations import calculate_implied_volatility as _pure_implied_volatility
+
+# fastmath without the no-NaN/no-inf assumptions: the formulas below rely
+# on +/-inf propagating out of get_w for degenerate inputs
+_FASTMATH = {"nsz", "arcp", "contract", "afn", "reassoc"}
+
+# Bracket the implied volatility search is confined to
+IV_LOWER_BOUND = 1e-6
+IV_UPPER_BOUND = 5.0
+
+_INV_SQRT_2 = 1 / math.sqrt(2)
+_INV_SQRT_2PI = 1 / math.sqrt(2*math.pi)
+
+@njit(cache=True, fastmath=_FASTMATH)
+def std_norm_cdf(x: float) -> float:
+    """
+    Calculate the cumulative distribution function of the standard normal distribution.
+
+    Args:
+        x: The input value
+
+    Returns:
+        The probability that a standard normal random variable will be less than or equal to x
+    """
+    # erfc(-x) == 1 + erf(x), without the cancellation in the lower tail
+    return 0.5 * math.erfc(-x * _INV_SQRT_2)
+
+@njit(cache=True, fastmath=_FASTMATH)
+def std_norm_pdf(x: float) -> float:
+    """
+    Calculate the probability density function of the standard normal distribution.
+
+    Args:
+        x: The input value
+
+    Returns:
+        The height of the probability density function at x
+    """
+    return math.exp(-x*x/2.0) * _INV_SQRT_2PI
+
+@njit(cache=True, fastmath=_FASTMATH)
+def get_w(s: float, k: float, t: float, v: float, r: float) -> float:
+    """
+    Calculate the W parameter used in the Black-Scholes formula.
+
+    Args:
+        s: Current price of the underlying
+        k: Strike price
+        t: Time to expiration in years
+        v: Volatility as a decimal
+        r: Annual risk-free interest rate as a decimal
+
+    Returns:
+        The W parameter for the Black-Scholes formula
+    """
+    denominator = v * math.sqrt(t) if t > 0 else 0.0
+    if s <= 0 or k <= 0 or denominator == 0:
+        return math.inf if s > k else -math.inf
+    return (math.log(s/k) + (r + (v*v)/2)*t) / denominator
+
+@njit(cache=True, fastmath=_FASTMATH)
+def _call_price(s: float, k: float, t: float, v: float, r: float) -> float:
+    """
+    Calculate the theoretical price of a call option using Black-Scholes.
+
+    Args:
+        s: Current price of the underlying
+        k: Strike price
+        t: Time to expiration in years
+        v: Volatility as a decimal
+        r: Annual risk-free interest rate as a decimal
+
+    Returns:
+        The theoretical price of the call option
+    """
+    if t <= 0:
+        return max(0.0, s - k)
+
+    w = get_w(s, k, t, v, r)
+    if not math.isfinite(w):
+        return max(0.0, s - k)
+
+    return s * std_norm_cdf(w) - k * math.exp(-r*t) * std_norm_cdf(w - v * math.sqrt(t))
+
+@njit(cache=True, fastmath=_FASTMATH)
+def _put_price(s: float, k: float, t: float, v: float, r: float) -> float:
+    """
+    Calculate the theoretical price of a put option using put-call parity.
+
+    Args:
+        s: Current price of the underlying
+        k: Strike price
+        t: Time to expiration in years
+        v: Volatility as a decimal
+        r: Annual risk-free interest rate as a decimal
+
+    Returns:
+        The theoretical price of the put option
+    """
+    return _call_price(s, k, t, v, r) - s + k * math.exp(-r*t)
+
+@njit(cache=True, fastmath=_FASTMATH)
+def _call_delta(s: float, k: float, t: float, v: float, r: float) -> float:
+    """
+    Calculate the delta of a call option.
+
+    Args:
+        s: Current price of the underlying
+        k: Strike price
+        t: Time to expiration in years
+        v: Volatility as a decimal
+        r: Annual risk-free interest rate as a decimal
+
+    Returns:
+        The delta of the call option
+    """
+    w = get_w(s, k, t, v, r)
+    if not math.isfinite(w):
+        return 1.0 if s > k else 0.0
+    return std_norm_cdf(w)
+
+@njit(cache=True, fastmath=_FASTMATH)
+def _put_delta(s: float, k: float, t: float, v: float, r: float) -> float:
+    """
+    Calculate the delta of a put option.
+
+    Args:
+        s: Current price of the underlying
+        k: Strike price
+        t: Time to expiration in years
+        v: Volatility as a decimal
+        r: Annual risk-free interest rate as a decimal
+
+    Returns:
+        The delta of the put option
+    """
+    delta = _call_delta(s, k, t, v, r) - 1
+    return 0.0 if delta == -1 and k == s else delta
+
+@njit(cache=True, fastmath=_FASTMATH)
+def _iv_initial_guess(s: float, k: float, t: float, r: float,
+                      market_price: float, is_call: bool) -> float:
+    """
+    Estimate implied volatility in closed form (Corrado-Miller, falling back to the
+    Manaster-Koehler point when it gives no positive estimate).
+
+    Returns:
+        The estimated volatility, clamped to [0.01, 3.0]
+    """
+    if t <= 0 or s <= 0 or k <= 0:
+        return 0.3
+
+    discounted_k = k * math.exp(-r*t)
+    call = market_price if is_call else market_price + s - discounted_k
+    half_moneyness = (s - discounted_k) / 2
+    radicand = max((call - half_moneyness)**2 - (s - discounted_k)**2 / math.pi, 0.0)
+
+    guess = math.sqrt(2*math.pi/t) / (s + discounted_k) * (call - half_moneyness + math.sqrt(radicand))
+    if not (guess > 0 and math.isfinite(guess)):
+        guess = math.sqrt(2 * abs(math.log(s/k) + r*t) / t)
+
+    return min(max(guess, 0.01), 3.0)
+
+@njit(cache=True, fastmath=_FASTMATH)
+def _within_price_bounds(s: float, k: float, discount: float, market_price: float, is_call: bool) -> bool:
+    """Check a price is strictly inside the no-arbitrage bounds (see option_calculations.get_price_bounds)"""
+    if is_call:
+        return max(s - k * discount, 0.0) < market_price < s
+    return max(k * discount - s, 0.0) < market_price < k * discount
+
+@njit(cache=True, fastmath=_FASTMATH)
+def _bs_price_core(log_moneyness: float, discount: float, sqrt_t: float,
+                   s: float, k: float, v: float, is_call: bool) -> Tuple[float, float]:
+    """
+    Black-Scholes price and W from quantities precomputed once per solve
+    (see option_calculations._bs_price_core).
+    """
+    denominator = v * sqrt_t
+    w = log_moneyness / denominator + 0.5 * denominator
+    call = s * std_norm_cdf(w) - k * discount * std_norm_cdf(w - denominator)
+    return (call if is_call else call - s + k * discount), w
+
+@njit(cache=True, fastmath=_FASTMATH)
+def _iv_newton(s: float, k: float, t: float, r: float, market_price: float, is_call: bool,
+               initial_vol: float, max_iterations: int, precision: float) -> float:
+    """
+    Halley implied volatility solve on log-price safeguarded by
+    bisection, seeded with _iv_initial_guess when initial_vol is NaN.
+
+    Returns:
+        The implied volatility, or NaN if the algorithm fails to converge
+    """
+    if t <= 0 or s <= 0 or k <= 0:
+        return math.nan
+    # s, k, t and r are fixed for the whole solve, so take their transcendentals once
+    sqrt_t = math.sqrt(t)
+    discount = math.exp(-r * t)
+    if not _within_price_bounds(s, k, discount, market_price, is_call):
+        return math.nan
+
+    v = initial_vol if not math.isnan(initial_vol) else _iv_initial_guess(s, k, t, r, market_price, is_call)
+    log_market = math.log(market_price)
+    log_moneyness = math.log(s / k) + r * t
+    lo, hi = IV_LOWER_BOUND, IV_UPPER_BOUND
+    if not lo < v < hi:
+        v = 0.5 * (lo + hi)
+
+    for i in range(max_iterations):
+        price, w = _bs_price_core(log_moneyness, discount, sqrt_t, s, k, v, is_call)
+        log_diff = math.log(max(price, 1e-30)) - log_market
+
+        if abs(log_diff) < precision:
+            return v
+
+        # Option prices increase with volatility, so the root is on the far side of v
+        if log_diff < 0:
+            lo = v
+        else:
+            hi = v
+        if hi - lo < precision:
+            if lo > IV_LOWER_BOUND and hi < IV_UPPER_BOUND:
+                return 0.5 * (lo + hi)
+            break  # Collapsed onto a bound: no volatility in range fits the price
+
+        vega = s * sqrt_t * std_norm_pdf(w)
+        # Halley update on log-price (see option_calculations.calculate_implied_volatility)
+        if abs(vega) >= 1e-10:
+            slope = vega / price
+            curvature = slope * w * (w - v * sqrt_t) / v - slope * slope
+            v_new = v - 2 * log_diff * slope / (2 * slope * slope - log_diff * curvature)
+        else:
+            v_new = math.nan
+
+        # Bisect when the step would leave the bracket
+        v = v_new if lo < v_new < hi else 0.5 * (lo + hi)
+
+    return math.nan
+
+@njit(cache=True)
+def _iv_newton_call(s: float, k: float, t: float, r: float, market_price: float,
+                    initial_vol: float, max_iterations: int, precision: float) -> float:
+    return _iv_newton(s, k, t, r, market_price, True, initial_vol, max_iterations, precision)
+
+@njit(cache=True)
+def _iv_newton_put(s: float, k: float, t: float, r: float, market_price: float,
+                   initial_vol: float, max_iterations: int, precision: float) -> float:
+    return _iv_newton(s, k, t, r, market_price, False, initial_vol, max_iterations, precision)
+
+@njit(cache=True, fastmath=_FASTMATH)
+def _signed_delta(s: float, k: float, t: float, v: float, r: float,
+                  call_put: int, direction: int) -> float:
+    """Delta with call_put and direction given as their OptionType/Direction values"""
+    delta = _call_delta(s, k, t, v, r) if call_put == 1 else _put_delta(s, k, t, v, r)
+    return direction * delta
+
+def get_delta(s: float, k: float, t: float, v: float, r: float,
+              call_put: OptionType, direction: Direction) -> float:
+    """
+    Calculate the delta of an option (compiled drop-in for option_calculations.get_delta).
+
+    Args:
+        s: Current price of the underlying
+        k: Strike price
+        t: Time to expiration in years
+        v: Volatility as a decimal
+        r: Annual risk-free interest rate as a decimal
+        call_put: The type of option - OptionType.CALL or OptionType.PUT
+        direction: The direction of the trade - Direction.BUY or Direction.SELL
+
+    Returns:
+        The delta of the option, with sign adjusted for trade direction
+    """
+    return _signed_delta(float(s), float(k), float(t), float(v), float(r),
+                         int(call_put), int(direction))
+
+def calculate_implied_volatility(
+    s: float, k: float, t: float, r: float,
+    market_price: float, call_put: OptionType,
+    initial_vol: Optional[float] = None,
+    max_iterations: int = 100,
+    precision: float = 1.0e-5
+) -> float:
+    """
+    Calculate implied volatility using Halley's method on log-price safeguarded
+    by bisection (compiled drop-in for option_calculations.calculate_implied_volatility).
+
+    Args:
+        s: Current price of the underlying
+        k: Strike price
+        t: Time to expiration in years
+        r: Annual risk-free interest rate as a decimal
+        market_price: Observed market price of the option
+        call_put: Option type - OptionType.CALL or OptionType.PUT
+        initial_vol: Starting guess for volatility; estimated with
+            _iv_initial_guess if not given
+        max_iterations: Maximum number of iterations
+        precision: Desired relative precision of the fitted price
+
+    Returns:
+        float: The implied volatility that produces the market price
+
+    Raises:
+        ValueError: If the algorithm fails to converge
+    """
+    solve = _iv_newton_call if call_put == OptionType.CALL else _iv_newton_put
+    v = solve(float(s), float(k), float(t), float(r), float(market_price),
+              math.nan if initial_vol is None else float(initial_vol),
+              int(max_iterations), float(precision))
+    if math.isnan(v):
+        raise ValueError("Implied volatility calculation did not converge")
+    return v
+
+# Deliberately serial: Streamlit sessions share one processor and call this from
+# their own threads, and Numba's default workqueue threading layer aborts the
+# process on concurrent use of a parallel kernel. A book is tens of options anyway.
+@njit(cache=True, fastmath=_FASTMATH)
+def _iv_batch(s, k, t, r, market_price, is_call, initial_vol, max_iterations, precision, out):
+    """Solve implied volatility for every option, writing into out"""
+    for i in range(s.shape[0]):
+        out[i] = _iv_newton(s[i], k[i], t[i], r, market_price[i], is_call[i],
+                            initial_vol[i], max_iterations, precision)
+
+def calculate_implied_volatility_vec(
+    s: np.ndarray, k: np.ndarray, t: np.ndarray, r: float,
+    market_price: np.ndarray, is_call: np.ndarray,
+    initial_vol: Optional[Union[float, np.ndarray]] = None,
+    max_iterations: int = 100,
+    precision: float = 1.0e-5
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Calculate implied volatilities for a batch of options in one compiled loop
+    (compiled drop-in for option_calculations_vec.calculate_implied_volatility_vec).
+
+    Args:
+        s: Current prices of the underlying
+        k: Strike prices
+        t: Times to expiration in years
+        r: Annual risk-free interest rate as a decimal
+        market_price: Observed market prices of the options
+        is_call: True for calls, False for puts
+        initial_vol: Starting guess for volatility, per option or shared; missing
+            or NaN entries are estimated with _iv_initial_guess
+        max_iterations: Maximum number of iterations
+        precision: Desired relative precision of the fitted price
+
+    Returns:
+        Tuple of (implied volatilities, boolean mask of the options that converged);
+        volatilities that did not converge are NaN
+    """
+    s, k, t, market_price = np.broadcast_arrays(
+        *(np.asarray(a, dtype=np.float64) for a in (s, k, t, market_price)))
+    is_call = np.broadcast_to(np.asarray(is_call, dtype=np.bool_), s.shape)
+    initial_vol = np.broadcast_to(
+        np.asarray(np.nan if initial_vol is None else initial_vol, dtype=np.float64), s.shape)
+    out = np.empty(s.shape[0])
+    _iv_batch(np.ascontiguousarray(s), np.ascontiguousarray(k), np.ascontiguousarray(t),
+              float(r), np.ascontiguousarray(market_price), np.ascontiguousarray(is_call),
+              np.ascontiguousarray(initial_vol), int(max_iterations), float(precision), out)
+    return out, ~np.isnan(out)
+
+def _check_batch_kernel():
+    """
+    Check the batch kernel against the pure-Python solver, so a miscompiled
+    kernel disables this module instead of returning volatilities that differ
+    from the fallback's
+    """
+    # At, in and out of the money, short and long dated, calls and puts
+    s = np.full(6, 100.0)
+    k = np.array([100.0, 100.0, 100.0, 120.0, 80.0, 110.0])
+    t = np.array([1.0, 0.25, 1.0, 7 / 365, 0.5, 2 / 365])
+    is_call = np.array([True, True, False, True, False, True])
+    v_true = np.array([0.2, 0.2, 0.2, 0.6, 0.35, 0.9])
+    market_price = np.array([(_call_price if c else _put_price)(100.0, k_i, t_i, v_i, 0.0)
+                             for k_i, t_i, v_i, c in zip(k, t, v_true, is_call)])
+    v, converged = calculate_implied_volatility_vec(s, k, t, 0.0, market_price, is_call)
+    expected = np.array([_pure_implied_volatility(100.0, k_i, t_i, 0.0, p_i,
+                                                  OptionType.CALL if c else OptionType.PUT)
+                         for k_i, t_i, p_i, c in zip(k, t, market_price, is_call)])
+    if not converged.all() or np.abs(v - expected).max() > 1e-8:
+        raise ImportError("Numba implied volatility kernel failed validation")
+
+_check_batch_kernel()
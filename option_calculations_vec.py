@@ -0,0 +1,242 @@
+import math
+import numpy as np
+from scipy.special import ndtr
+from typing import Optional, Tuple, Union
+
+# Bracket the implied volatility search is confined to
+IV_LOWER_BOUND = 1e-6
+IV_UPPER_BOUND = 5.0
+
+_INV_SQRT_2PI = 1.0 / math.sqrt(2.0 * math.pi)
+
+def std_norm_pdf_vec(x: np.ndarray) -> np.ndarray:
+    """
+    Calculate the standard normal probability density elementwise.
+
+    Args:
+        x: The input values
+
+    Returns:
+        The height of the probability density function at each x
+    """
+    return np.exp(-0.5 * x * x) * _INV_SQRT_2PI
+
+def get_w_vec(s: np.ndarray, k: np.ndarray, t: np.ndarray, v: np.ndarray, r: float) -> np.ndarray:
+    """
+    Calculate the W parameter (d1) of the Black-Scholes formula elementwise.
+
+    Args:
+        s: Current prices of the underlying
+        k: Strike prices
+        t: Times to expiration in years
+        v: Volatilities as decimals
+        r: Annual risk-free interest rate as a decimal
+
+    Returns:
+        The W parameters; +/-inf where the scalar version would overflow
+    """
+    with np.errstate(divide='ignore', invalid='ignore'):
+        w = (np.log(s / k) + (r + 0.5 * v * v) * t) / (v * np.sqrt(t))
+    return np.where(np.isnan(w), np.where(s > k, np.inf, -np.inf), w)
+
+def _call_price_vec(s: np.ndarray, k: np.ndarray, t: np.ndarray, v: np.ndarray, r: float) -> np.ndarray:
+    """
+    Calculate Black-Scholes call prices elementwise.
+
+    Args:
+        s: Current prices of the underlying
+        k: Strike prices
+        t: Times to expiration in years
+        v: Volatilities as decimals
+        r: Annual risk-free interest rate as a decimal
+
+    Returns:
+        The theoretical call prices, intrinsic value where t <= 0 or W is not finite
+    """
+    w = get_w_vec(s, k, t, v, r)
+    with np.errstate(invalid='ignore'):
+        price = s * ndtr(w) - k * np.exp(-r * t) * ndtr(w - v * np.sqrt(t))
+    return np.where((t > 0) & np.isfinite(w), price, np.maximum(s - k, 0.0))
+
+def _bs_price_core_vec(log_moneyness: np.ndarray, discount: np.ndarray, sqrt_t: np.ndarray,
+                       s: np.ndarray, k: np.ndarray, v: np.ndarray,
+                       is_call: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Calculate Black-Scholes prices elementwise from quantities precomputed once
+    per solve (see option_calculations._bs_price_core).
+
+    Args:
+        log_moneyness: log(s/k) + r*t
+        discount: Discount factors exp(-r*t)
+        sqrt_t: Square roots of the times to expiration
+        s: Current prices of the underlying
+        k: Strike prices
+        v: Volatilities as decimals
+        is_call: True for calls, False for puts
+
+    Returns:
+        Tuple of (option prices, W parameters)
+    """
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        denominator = v * sqrt_t
+        w = log_moneyness / denominator + 0.5 * denominator
+        call = s * ndtr(w) - k * discount * ndtr(w - denominator)
+    return np.where(is_call, call, call - s + k * discount), w
+
+def get_delta_vec(s: np.ndarray, k: np.ndarray, t: np.ndarray, v: np.ndarray, r: float,
+                  is_call: np.ndarray, is_buy: np.ndarray) -> np.ndarray:
+    """
+    Calculate option deltas elementwise.
+
+    Args:
+        s: Current prices of the underlying
+        k: Strike prices
+        t: Times to expiration in years
+        v: Volatilities as decimals
+        r: Annual risk-free interest rate as a decimal
+        is_call: True for calls, False for puts
+        is_buy: True for BUY positions, False for SELL positions
+
+    Returns:
+        The option deltas, with sign adjusted for trade direction
+    """
+    # phi = +1 for calls and -1 for puts gives both deltas as phi * N(phi * W); the
+    # put form N(-W) avoids the cancellation in N(W) - 1 deep in the money
+    phi = np.where(is_call, 1.0, -1.0)
+    return np.where(is_buy, phi, -phi) * ndtr(phi * get_w_vec(s, k, t, v, r))
+
+def _iv_initial_guess_vec(s: np.ndarray, k: np.ndarray, t: np.ndarray, r: float,
+                          market_price: np.ndarray, is_call: np.ndarray) -> np.ndarray:
+    """
+    Estimate implied volatilities elementwise (Corrado-Miller, falling back to the
+    Manaster-Koehler point when it gives no positive estimate); see option_calculations._iv_initial_guess.
+
+    Args:
+        s: Current prices of the underlying
+        k: Strike prices
+        t: Times to expiration in years
+        r: Annual risk-free interest rate as a decimal
+        market_price: Observed market prices of the options
+        is_call: True for calls, False for puts
+
+    Returns:
+        The estimated volatilities, clamped to [0.01, 3.0]
+    """
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        discounted_k = k * np.exp(-r * t)
+        call = np.where(is_call, market_price, market_price + s - discounted_k)
+        half_moneyness = (s - discounted_k) / 2
+        radicand = np.maximum((call - half_moneyness)**2 - (s - discounted_k)**2 / np.pi, 0.0)
+        guess = np.sqrt(2 * np.pi / t) / (s + discounted_k) * (call - half_moneyness + np.sqrt(radicand))
+        fallback = np.sqrt(2 * np.abs(np.log(s / k) + r * t) / t)
+    guess = np.where((guess > 0) & np.isfinite(guess), guess, fallback)
+    guess = np.where((t > 0) & (s > 0) & (k > 0), guess, 0.3)
+    return np.clip(np.nan_to_num(guess, nan=0.3), 0.01, 3.0)
+
+def get_price_bounds_vec(s: np.ndarray, k: np.ndarray, t: np.ndarray, r: float,
+                         is_call: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Calculate the no-arbitrage bounds on option prices elementwise
+    (see option_calculations.get_price_bounds).
+
+    Args:
+        s: Current prices of the underlying
+        k: Strike prices
+        t: Times to expiration in years
+        r: Annual risk-free interest rate as a decimal
+        is_call: True for calls, False for puts
+
+    Returns:
+        Tuple of (lower, upper) bound arrays
+    """
+    discounted_k = k * np.exp(-r * t)
+    lower = np.maximum(np.where(is_call, s - discounted_k, discounted_k - s), 0.0)
+    upper = np.where(is_call, s, discounted_k)
+    return lower, upper
+
+def calculate_implied_volatility_vec(
+    s: np.ndarray, k: np.ndarray, t: np.ndarray, r: float,
+    market_price: np.ndarray, is_call: np.ndarray,
+    initial_vol: Optional[Union[float, np.ndarray]] = None,
+    max_iterations: int = 100,
+    precision: float = 1.0e-5
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Calculate implied volatilities for a batch of options with Halley's method
+    on log-price safeguarded by bisection (see option_calculations.calculate_implied_volatility).
+
+    All options iterate together; once an option converges (or its bracket
+    collapses onto a bound) its volatility is held constant while the rest carry on.
+
+    Args:
+        s: Current prices of the underlying
+        k: Strike prices
+        t: Times to expiration in years
+        r: Annual risk-free interest rate as a decimal
+        market_price: Observed market prices of the options
+        is_call: True for calls, False for puts
+        initial_vol: Starting guess for volatility, per option or shared; missing
+            or NaN entries are estimated with _iv_initial_guess_vec
+        max_iterations: Maximum number of iterations
+        precision: Desired relative precision of the fitted prices
+
+    Returns:
+        Tuple of (implied volatilities, boolean mask of the options that converged)
+
+    Example:
+        >>> # ATM call option
+        >>> s, k, t = np.array([100.0]), np.array([100.0]), np.array([1/365])
+        >>> iv, ok = calculate_implied_volatility_vec(s, k, t, 0, np.array([2.0]), np.array([True]))
+        >>> bool(ok[0] and abs(_call_price_vec(s, k, t, iv, 0)[0] - 2.0) < 1e-4)
+        True
+    """
+    s, k, t, market_price = np.broadcast_arrays(
+        *(np.asarray(a, dtype=np.float64) for a in (s, k, t, market_price)))
+    v = np.array(np.broadcast_to(np.nan if initial_vol is None else initial_vol, s.shape),
+                 dtype=np.float64)
+    unseeded = np.isnan(v)
+    if unseeded.any():
+        v[unseeded] = _iv_initial_guess_vec(s, k, t, r, market_price, is_call)[unseeded]
+    lo = np.full(s.shape, IV_LOWER_BOUND)
+    hi = np.full(s.shape, IV_UPPER_BOUND)
+    v = np.where((v > lo) & (v < hi), v, 0.5 * (lo + hi))
+    converged = np.zeros(s.shape, dtype=bool)
+    # Prices on or outside the no-arbitrage bounds have no solution; don't iterate them
+    lower, upper = get_price_bounds_vec(s, k, t, r, is_call)
+    active = (market_price > lower) & (market_price < upper) & (t > 0)
+    # s, k, t and r are fixed for the whole solve, so take their transcendentals once
+    with np.errstate(divide='ignore', invalid='ignore'):
+        log_market = np.log(market_price)
+        sqrt_t = np.sqrt(t)
+        discount = np.exp(-r * t)
+        log_moneyness = np.log(s / k) + r * t
+
+    for i in range(max_iterations):
+        price, w = _bs_price_core_vec(log_moneyness, discount, sqrt_t, s, k, v, is_call)
+        log_diff = np.log(np.maximum(price, 1e-30)) - log_market
+        converged |= active & (np.abs(log_diff) < precision)
+        active &= ~converged
+
+        # Option prices increase with volatility, so the root is on the far side of v
+        lo = np.where(active & (log_diff < 0), v, lo)
+        hi = np.where(active & (log_diff >= 0), v, hi)
+        collapsed = active & (hi - lo < precision)
+        interior = collapsed & (lo > IV_LOWER_BOUND) & (hi < IV_UPPER_BOUND)
+        converged |= interior
+        v = np.where(interior, 0.5 * (lo + hi), v)
+        active &= ~collapsed
+        if not active.any():
+            break
+
+        with np.errstate(invalid='ignore'):
+            vega = np.where(np.isfinite(w), s * sqrt_t * std_norm_pdf_vec(w), 0.0)
+        with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+            # Halley update on log-price (see option_calculations.calculate_implied_volatility)
+            slope = vega / price
+            curvature = slope * w * (w - v * sqrt_t) / v - slope * slope
+            v_new = v - 2 * log_diff * slope / (2 * slope * slope - log_diff * curvature)
+        # Bisect when the step would leave the bracket or vega vanishes
+        newton = (np.abs(vega) >= 1e-10) & (v_new > lo) & (v_new < hi)
+        v = np.where(active, np.where(newton, v_new, 0.5 * (lo + hi)), v)
+
+    return v, converged
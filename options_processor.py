@@ -1,15 +1,150 @@
 import math
+import re
+import functools
+import numpy as np
 from typing import List, Dict, Optional, Tuple
 import logging
 from datetime import datetime, date
-import calendar
-from epic_mapping import MARKET_TO_EPIC
-from option_calculations import get_delta, calculate_implied_volatility
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from epic_mapping import epic_for
+from ig_api import IGAPIError, IGAuthError, MAX_FETCH_WORKERS
+from option_calculations import OptionType, Direction, get_price_bounds
+from option_calculations_vec import get_delta_vec, get_price_bounds_vec
+try:
+    # Compiled solvers when Numba is installed
+    from option_calculations_numba import (
+        get_delta, calculate_implied_volatility, calculate_implied_volatility_vec)
+except ImportError:
+    from option_calculations import get_delta, calculate_implied_volatility
+    from option_calculations_vec import calculate_implied_volatility_vec
+
+logger = logging.getLogger(__name__)
+
+@functools.lru_cache(maxsize=512)
+def _resolve_underlying_epic(market_id: str) -> Optional[str]:
+    """Memoised epic_for; a market ID's epic never changes within a run"""
+    # Keys are normalised, so spacing/case variants of the ID all match
+    return epic_for(market_id)
+
+# The strike is the last number before the CALL/PUT word, e.g. "Weekly Germany 40 (Wed) 21500 CALL"
+_OPTION_NAME_RE = re.compile(r'(\d+(?:\.\d+)?)\D*?(?<![A-Z])(CALL|PUT)(?!\w)', re.IGNORECASE)
+_OPTION_TYPE_RE = re.compile(r'(?<![A-Z])(?:CALL|PUT)(?!\w)', re.IGNORECASE)
+# OP.D.MARKET.STRIKECP.IP, e.g. "OP.D.SPX1.6000C.IP"
+_OPTION_EPIC_RE = re.compile(r'^[^.]+\.[^.]+\.[^.]+\.(\d+)([CP])\.[^.]+$', re.IGNORECASE)
+
+@functools.lru_cache(maxsize=1024)
+def _parse_option_name(name: str) -> Tuple[float, str]:
+    """Parse (strike, 'call' | 'put') from an option name; memoised, names repeat every poll"""
+    match = _OPTION_NAME_RE.search(name)
+    if not match:
+        if not _OPTION_TYPE_RE.search(name):
+            reason = f"Could not find option type (CALL/PUT) in: {name}"
+        else:
+            reason = f"Could not find strike price in: {name}"
+        raise ValueError(f"Failed to parse option name {name}: {reason}")
+
+    return float(match.group(1)), match.group(2).lower()
+
+def _third_friday(year: int, month: int) -> date:
+    """Get the third Friday of a given month"""
+    # The third Friday is the first Friday (weekday 4) on or after the 15th
+    fifteenth = date(year, month, 15)
+    return date(year, month, 15 + (4 - fifteenth.weekday()) % 7)
+
+@functools.lru_cache(maxsize=256)
+def _parse_expiry_date(expiry: str) -> date:
+    """
+    Parse expiry date string into a date object; memoised, since a book has
+    only a handful of distinct expiries and strptime is slow
+
+    Args:
+        expiry: Date string in format "DD-MMM-YY" or "MMM-YY"
+
+    Returns:
+        date: The expiry date
+    """
+    try:
+        # Try full date format first (e.g., "29-JAN-25")
+        try:
+            return datetime.strptime(expiry, "%d-%b-%y").date()
+        except ValueError:
+            # Try month-year format (e.g., "MAR-25")
+            month_str, year_str = expiry.split('-')
+            year = 2000 + int(year_str)  # Convert "25" to 2025
+            month = datetime.strptime(month_str, "%b").month
+            return _third_friday(year, month)
+    except Exception as e:
+        raise ValueError(f"Failed to parse expiry date {expiry}: {str(e)}")
+
+@functools.lru_cache(maxsize=256)
+def _time_to_expiry_cached(expiry_str: str, today_ordinal: int) -> float:
+    """
+    Calculate time to expiry in years, memoised per expiry string and day
+
+    Args:
+        expiry_str: Expiry date string
+        today_ordinal: Today's date as returned by date.toordinal()
+
+    Returns:
+        float: Time to expiry in years
+    """
+    days_to_expiry = _parse_expiry_date(expiry_str).toordinal() - today_ordinal
+    # One clamp covers both expired (negative) and same-day (0) options; 0.001 keeps IV computable
+    return max(days_to_expiry / 365.0, 0.001)
+
+@dataclass
+class PositionBatch:
+    """
+    Black-Scholes inputs for a book of options held column-wise, one array per
+    field, so the solver and delta stages run on contiguous arrays instead of
+    looking fields up in per-position dicts
+    """
+    index: np.ndarray         # Position's index in the API's positions list
+    epic: List[str]
+    s: np.ndarray             # Underlying mid prices
+    k: np.ndarray             # Strikes
+    t: np.ndarray             # Times to expiry in years
+    market_price: np.ndarray  # Option mid prices
+    is_call: np.ndarray
+    is_buy: np.ndarray
+
+    @classmethod
+    def from_inputs(cls, positions: List[Dict], inputs: List[Tuple[int, Dict]]) -> 'PositionBatch':
+        """
+        Build a batch from the per-position inputs in a single pass
+
+        Args:
+            positions: The positions list from the IG API
+            inputs: (position index, get_option_inputs result) pairs
+
+        Returns:
+            PositionBatch: The inputs as columns, in the order given
+        """
+        n = len(inputs)
+        batch = cls(index=np.empty(n, dtype=np.intp), epic=[''] * n,
+                    s=np.empty(n), k=np.empty(n), t=np.empty(n), market_price=np.empty(n),
+                    is_call=np.empty(n, dtype=np.bool_), is_buy=np.empty(n, dtype=np.bool_))
+        for j, (i, x) in enumerate(inputs):
+            batch.index[j] = i
+            batch.epic[j] = positions[i]['market']['epic']
+            batch.s[j] = x['s']
+            batch.k[j] = x['k']
+            batch.t[j] = x['t']
+            batch.market_price[j] = x['market_price']
+            batch.is_call[j] = x['call_put'] == OptionType.CALL
+            batch.is_buy[j] = x['direction'] == Direction.BUY
+        return batch
 
 class OptionsProcessor:
 
     def __init__(self, ig_client):
         self.ig_client = ig_client
+        # epic -> (solver inputs, implied volatility) from the previous poll
+        self._iv_warm_start: Dict[str, Tuple[Tuple, float]] = {}
+        # Number of option valuations whose price was outside the no-arbitrage
+        # bounds, so no implied volatility was solved for and the default was used
+        self.iv_skipped_counter = 0
 
     def is_option(self, epic: str) -> bool:
         """Check if an instrument is an option based on its epic"""
@@ -17,11 +152,7 @@ class OptionsProcessor:
 
     def get_third_friday(self, year: int, month: int) -> date:
         """Get the third Friday of a given month"""
-        c = calendar.monthcalendar(year, month)
-        # Get all Fridays (index 4) in the month
-        fridays = [week[4] for week in c if week[4] != 0]
-        # Return the third one (index 2)
-        return date(year, month, fridays[2])
+        return _third_friday(year, month)
 
     def parse_expiry_date(self, expiry: str) -> date:
         """
@@ -33,33 +164,23 @@ class OptionsProcessor:
         Returns:
             date: The expiry date
         """
-        try:
-            # Try full date format first (e.g., "29-JAN-25")
-            try:
-                return datetime.strptime(expiry, "%d-%b-%y").date()
-            except ValueError:
-                # Try month-year format (e.g., "MAR-25")
-                month_str, year_str = expiry.split('-')
-                year = 2000 + int(year_str)  # Convert "25" to 2025
-                month = datetime.strptime(month_str, "%b").month
-                return self.get_third_friday(year, month)
-        except Exception as e:
-            raise ValueError(f"Failed to parse expiry date {expiry}: {str(e)}")
+        return _parse_expiry_date(expiry)
 
-    def calculate_time_to_expiry(self, expiry_str: str) -> float:
+    def calculate_time_to_expiry(self, expiry_str: str, today: Optional[date] = None) -> float:
         """
         Calculate time to expiry in years
 
         Args:
             expiry_str: Expiry date string
+            today: The date to measure from; defaults to date.today()
 
         Returns:
             float: Time to expiry in years
         """
-        expiry_date = self.parse_expiry_date(expiry_str)
-        today = date.today()
-        days_to_expiry = (expiry_date - today).days
-        return max(max(days_to_expiry, 0) / 365.0, 0.001)  # Ensure non-negative, replace same-day option's 0 value with 0.001 to ensure IV computations later 
+        if today is None:
+            today = date.today()
+        # Keyed on today's date so cached values roll over at midnight
+        return _time_to_expiry_cached(expiry_str, today.toordinal())
 
     def parse_option_epic(self, epic: str) -> Tuple[float, str]:
         """
@@ -74,27 +195,12 @@ class OptionsProcessor:
         Raises:
             ValueError: If EPIC format is invalid
         """
-        try:
-            # Split EPIC into components
-            parts = epic.split('.')
-            if len(parts) != 5:  # Should be: OP.D.MARKET.STRIKECP.IP
-                raise ValueError(f"Invalid EPIC format: {epic}")
+        match = _OPTION_EPIC_RE.match(epic)
+        if not match:
+            raise ValueError(f"Failed to parse option EPIC {epic}: Invalid EPIC format: {epic}")
 
-            # Get the strike and type part (e.g., "6000C")
-            strike_type = parts[3]
-
-            # Extract strike price (all digits) and type (last character)
-            strike_str = ''.join(c for c in strike_type if c.isdigit())
-            option_type = strike_type[-1].lower()
-
-            # Validate option type
-            if option_type not in ['c', 'p']:
-                raise ValueError(f"Invalid option type (currently supporting only Call and Put): {option_type}")
-
-            return float(strike_str), 'call' if option_type == 'c' else 'put'
-
-        except Exception as e:
-            raise ValueError(f"Failed to parse option EPIC {epic}: {str(e)}")
+        strike_str, option_type = match.groups()
+        return float(strike_str), 'call' if option_type.lower() == 'c' else 'put'
 
     def parse_option_info(self, name: str) -> Tuple[float, str]:
         """
@@ -115,35 +221,7 @@ class OptionsProcessor:
         Raises:
             ValueError: If name format is invalid
         """
-        try:
-            # Find CALL/PUT in the name
-            for word in ['CALL', 'PUT']:
-                if word in name.upper():
-                    option_type = word.lower()
-                    # Split the name at CALL/PUT
-                    prefix = name.upper().split(word)[0].strip()
-                    break
-            else:
-                raise ValueError(f"Could not find option type (CALL/PUT) in: {name}")
-                
-            # Find the last number in the prefix - this will be our strike
-            # This handles cases where the number might be connected to other text like "(Wed)21500"
-            strike_match = ''
-            for char in reversed(prefix):
-                if char.isdigit():
-                    strike_match = char + strike_match
-                elif strike_match:  # Stop once we hit non-digits after finding some digits
-                    break
-                    
-            if not strike_match:
-                raise ValueError(f"Could not find strike price in: {name}")
-                
-            strike = float(strike_match)
-                
-            return strike, option_type
-            
-        except Exception as e:
-            raise ValueError(f"Failed to parse option name {name}: {str(e)}")
+        return _parse_option_name(name)
 
     def get_underlying_epic(self, market_id: str) -> Optional[str]:
         """
@@ -155,21 +233,7 @@ class OptionsProcessor:
         Returns:
             str: The epic code for the underlying instrument, or None if not found
         """
-        # Try direct lookup first
-        if market_id in MARKET_TO_EPIC:
-            return MARKET_TO_EPIC[market_id]
-
-        # Try alternate formats (with/without space)
-        alternates = [
-            market_id.replace(" ", ""),  # Remove spaces
-            f"{market_id[:2]} {market_id[2:]}"  # Add space after 2 chars
-        ]
-
-        for alt in alternates:
-            if alt in MARKET_TO_EPIC:
-                return MARKET_TO_EPIC[alt]
-
-        return None
+        return _resolve_underlying_epic(market_id)
 
     def adjust_fx_strike(self, raw_strike: float, underlying_price: float) -> float:
         """
@@ -183,120 +247,247 @@ class OptionsProcessor:
         Returns:
             Adjusted strike price with correct decimal placement
         """
+        if raw_strike <= 0 or underlying_price <= 0:
+            return raw_strike
+
         # If the strike is already in the same magnitude as underlying, return as-is
-        strike_magnitude = abs(math.floor(math.log10(raw_strike)))
-        underlying_magnitude = abs(math.floor(math.log10(underlying_price)))
-        
-        if abs(strike_magnitude - underlying_magnitude) <= 1:  # Allow for 1 order of magnitude difference
+        strike_exponent = math.floor(math.log10(raw_strike))
+        underlying_exponent = math.floor(math.log10(underlying_price))
+
+        if abs(abs(strike_exponent) - abs(underlying_exponent)) <= 1:  # Allow for 1 order of magnitude difference
             return raw_strike
-            
-        # Convert both numbers to strings to count digits before decimal
-        underlying_str = f"{underlying_price:.6f}"
-        underlying_whole_digits = len(underlying_str.split('.')[0])
-        
+
+        # Digits before the decimal point follow from the exponents (at least 1, for numbers below 1)
+        underlying_whole_digits = max(underlying_exponent + 1, 1)
+        raw_strike_digits = max(strike_exponent + 1, 1)
+
         # Calculate how many digits to shift the strike
-        raw_strike_digits = len(str(int(raw_strike)))
         decimal_shift = raw_strike_digits - underlying_whole_digits
         
         return raw_strike / (10 ** decimal_shift)
+
+    def fetch_market_details(self, epics: List[str]) -> Dict[str, Dict]:
+        """
+        Fetch market details for several epics, preferring the bulk endpoint
+        and falling back to concurrent per-epic requests
+
+        Args:
+            epics: The epics to fetch
+
+        Returns:
+            dict: Market details keyed by epic
+        """
+        try:
+            return self.ig_client.get_markets_bulk(epics)
+        except IGAuthError:
+            raise
+        except IGAPIError as e:
+            logger.warning("Bulk market details fetch failed, fetching individually: %s", e)
+            return self.ig_client.get_market_details_many(epics)
+
+    def prefetch_market_details(self, positions: List[Dict]) -> Dict[str, Dict]:
+        """
+        Fetch market details for every distinct option and then every distinct
+        underlying with one bulk request each, so a book of N options on U
+        underlyings needs N + U lookups rather than one option and one
+        underlying lookup per position
+
+        Args:
+            positions: The positions list from the IG API
+
+        Returns:
+            dict: Market details keyed by epic (options and underlyings); epics
+                that could not be fetched are left out
+        """
+        market_details = {}
+        try:
+            option_details = self.fetch_market_details(
+                list({position['market']['epic'] for position in positions}))
+            market_details.update(option_details)
+
+            underlying_epics = set()
+            for details in option_details.values():
+                market_id = details['instrument'].get('marketId')
+                underlying_epic = self.get_underlying_epic(market_id) if market_id else None
+                if underlying_epic:
+                    underlying_epics.add(underlying_epic)
+
+            if underlying_epics:
+                market_details.update(self.fetch_market_details(list(underlying_epics)))
+        except IGAuthError:
+            raise
+        except IGAPIError as e:
+            # Positions whose details are missing are fetched again individually
+            logger.warning("Market details prefetch failed: %s", e)
+        return market_details
+
+    def _get_market_details(self, epic: str, market_details: Optional[Dict[str, Dict]]) -> Dict:
+        """
+        Look up prefetched market details for an epic, fetching them if missing;
+        fetched details are added to market_details so the rest of the poll
+        reuses them (e.g. other options on the same underlying)
+        """
+        if market_details is None:
+            return self.ig_client.get_market_details(epic)
+        details = market_details.get(epic)
+        if details is None:
+            details = market_details.setdefault(epic, self.ig_client.get_market_details(epic))
+        return details
     
-    def process_option_position(self, position: Dict) -> Dict:
+    def get_option_inputs(self, position: Dict,
+                          market_details: Optional[Dict[str, Dict]] = None,
+                          today: Optional[date] = None) -> Dict:
+        """
+        Gather the Black-Scholes inputs for an option position
+
+        Args:
+            position: The position data from the IG API
+            market_details: Prefetched market details keyed by epic; epics
+                missing from it are fetched from the API
+            today: The date to measure time to expiry from; defaults to date.today()
+
+        Returns:
+            dict: Underlying price (s), strike (k), time to expiry (t), interest
+                rate (r), option mid price, option type and trade direction
+        """
+        # Get option details
+        option_epic = position['market']['epic']
+        option_details = self._get_market_details(option_epic, market_details)
+
+        # Parse strike price and option type from EPIC
+        option_name = position['market']['instrumentName']
+        strike_price, option_type = self.parse_option_info(option_name)
+
+        # Extract underlying market ID and find corresponding epic
+        underlying_market_id = option_details['instrument'].get('marketId')
+        if not underlying_market_id:
+            raise ValueError(
+                f"No underlying market ID found for option {option_epic}")
+
+        #print("underlying_market_id", underlying_market_id)
+        underlying_epic = self.get_underlying_epic(underlying_market_id)
+        if not underlying_epic:
+            raise ValueError(
+                f"No epic mapping found for underlying {underlying_market_id}"
+            )
+
+        # Get underlying market details
+        underlying_details = self._get_market_details(
+            underlying_epic, market_details)
+        
+        #print("underlying_details")
+        #print(underlying_details)
+
+        # Extract required values for delta calculation
+        current_price = (float(underlying_details['snapshot']['bid']) + float(underlying_details['snapshot']['offer'])) / 2.0
+        #print(strike_price)
+        #print(current_price)
+        adjusted_strike = self.adjust_fx_strike(strike_price, current_price)
+        time_to_expiry = self.calculate_time_to_expiry(
+            position['market']['expiry'], today)
+        interest_rate = 0  # Using 0% as default risk-free rate
+
+        # Calculate implied volatility using mid price
+        bid = float(position['market']['bid'])
+        offer = float(position['market']['offer'])
+        market_price = (bid + offer) / 2.0
+
+        return {
+            's': current_price,
+            'k': adjusted_strike,
+            't': time_to_expiry,
+            'r': interest_rate,
+            'market_price': market_price,
+            'call_put': OptionType[option_type.upper()],
+            'direction': Direction[position['position']['direction']]
+        }
+
+    def _option_inputs_or_error(self, position: Dict, market_details: Optional[Dict[str, Dict]] = None,
+                                today: Optional[date] = None) -> Tuple[Optional[Dict], Optional[str]]:
+        """
+        Gather the Black-Scholes inputs for a position, catching per-position failures
+
+        Args:
+            position: The position data from the IG API
+            market_details: Prefetched market details keyed by epic
+            today: The date to measure time to expiry from; defaults to date.today()
+
+        Returns:
+            Tuple of (inputs, None) on success or (None, error message) on failure
+        """
+        try:
+            return self.get_option_inputs(position, market_details, today), None
+        except IGAuthError:
+            raise
+        except Exception as e:
+            logger.error("Error processing option position: %s", e)
+            return None, str(e)
+
+    def process_option_position(self, position: Dict,
+                                market_details: Optional[Dict[str, Dict]] = None) -> Dict:
         """
         Process a single option position to calculate its delta
 
         Args:
             position: The position data from the IG API
+            market_details: Prefetched market details keyed by epic; epics
+                missing from it are fetched from the API
 
         Returns:
             dict: Position data enriched with delta calculations
         """
         try:
-            # Get option details
-            option_epic = position['market']['epic']
-            option_details = self.ig_client.get_market_details(option_epic)
-
-            # Parse strike price and option type from EPIC
-            option_name = position['market']['instrumentName']
-            strike_price, option_type = self.parse_option_info(option_name)
-
-            # Extract underlying market ID and find corresponding epic
-            underlying_market_id = option_details['instrument'].get('marketId')
-            if not underlying_market_id:
-                raise ValueError(
-                    f"No underlying market ID found for option {option_epic}")
-
-            #print("underlying_market_id", underlying_market_id)
-            underlying_epic = self.get_underlying_epic(underlying_market_id)
-            if not underlying_epic:
-                raise ValueError(
-                    f"No epic mapping found for underlying {underlying_market_id}"
-                )
-
-            # Get underlying market details
-            underlying_details = self.ig_client.get_market_details(
-                underlying_epic)
-            
-            #print("underlying_details")
-            #print(underlying_details)
-
-            # Extract required values for delta calculation
-            current_price = (float(underlying_details['snapshot']['bid']) + float(underlying_details['snapshot']['offer'])) / 2.0
-            #print(strike_price)
-            #print(current_price)
-            adjusted_strike = self.adjust_fx_strike(strike_price, current_price)
-            time_to_expiry = self.calculate_time_to_expiry(
-                position['market']['expiry'])
-            interest_rate = 0  # Using 0% as default risk-free rate
-
-            # Calculate implied volatility using mid price
-            bid = float(position['market']['bid'])
-            offer = float(position['market']['offer'])
-            market_price = (bid + offer) / 2.0
-
-            direction = position['position']['direction']
-
-            try:
-                volatility = calculate_implied_volatility(
-                    s=current_price,
-                    k=adjusted_strike,
-                    t=time_to_expiry,
-                    r=interest_rate,
-                    market_price=market_price,
-                    call_put=option_type
-                )
-            except ValueError as e:
-                logging.warning(f"Failed to calculate IV: {str(e)}")
-                volatility = 0.20  # Default to 20% if IV calculation fails
+            inputs = self.get_option_inputs(position, market_details)
+
+            lower, upper = get_price_bounds(
+                inputs['s'], inputs['k'], inputs['t'], inputs['r'], inputs['call_put'])
+            volatility = 0.20  # Default to 20% if IV calculation fails
+            if lower < inputs['market_price'] < upper:
+                try:
+                    volatility = calculate_implied_volatility(
+                        s=inputs['s'], k=inputs['k'], t=inputs['t'], r=inputs['r'],
+                        market_price=inputs['market_price'], call_put=inputs['call_put'])
+                except ValueError as e:
+                    logger.warning("Failed to calculate IV: %s", e)
+            else:
+                self.iv_skipped_counter += 1
+                logger.debug("Skipping IV for %s: price outside no-arbitrage bounds", position['market']['epic'])
 
             # Calculate delta
-            delta = get_delta(s=current_price,
-                              k=adjusted_strike,
-                              t=time_to_expiry,
+            delta = get_delta(s=inputs['s'],
+                              k=inputs['k'],
+                              t=inputs['t'],
                               v=volatility,
-                              r=interest_rate,
-                              call_put=option_type,
-                              direction=direction)
+                              r=inputs['r'],
+                              call_put=inputs['call_put'],
+                              direction=inputs['direction'])
 
             # Enrich position data with calculations
             return {
                 **position, 'calculations': {
                     'delta': delta,
-                    'underlying_price': current_price,
-                    'strike_price': adjusted_strike,
-                    'time_to_expiry': time_to_expiry,
+                    'underlying_price': inputs['s'],
+                    'strike_price': inputs['k'],
+                    'time_to_expiry': inputs['t'],
                     'volatility': volatility,
-                    'interest_rate': interest_rate
+                    'interest_rate': inputs['r']
                 }
             }
 
+        except IGAuthError:
+            # A new login is needed; don't keep querying the API for the rest of the book
+            raise
         except Exception as e:
-            logging.error(f"Error processing option position: {str(e)}")
+            logger.error("Error processing option position: %s", e)
             return {**position, 'calculations': {'error': str(e)}}
 
     def process_positions(self, positions_data: Dict) -> Dict:
         """
         Process all positions, calculating delta for options
 
+        Implied volatility and delta are solved for the whole book at once
+        with the vectorised Black-Scholes functions.
+
         Args:
             positions_data: The raw positions data from the IG API
 
@@ -306,24 +497,85 @@ class OptionsProcessor:
         if not positions_data or 'positions' not in positions_data:
             return {"message": "No positions found"}
 
-        processed_positions = []
+        positions = positions_data['positions']
+        market_details = self.prefetch_market_details(positions)
+        # One date for the whole book, so a poll straddling midnight stays consistent
+        today = date.today()
 
-        for position in positions_data['positions']:
-            epic = position['market']['epic']
-            processed_position = self.process_option_position(position)
-            '''
-            if self.is_option(epic):
-                processed_position = self.process_option_position(position)
-            
-            else:
-                logging.info(f"{str(epic)} is not a vanilla Call or Put")
-                processed_position = {
-                    **position,
-                    'calculations': {
-                        'error': "Not a vanilla call or put options"
-                    }
+        # Gather inputs per position; positions that fail keep their error (non-options
+        # are not pre-filtered with is_option, they fail name parsing instead). Details
+        # the prefetch missed are fetched per position, so run the positions on a
+        # thread pool to overlap those requests (the GIL is released while they wait)
+        with ThreadPoolExecutor(max_workers=max(1, min(MAX_FETCH_WORKERS, len(positions)))) as executor:
+            gathered = list(executor.map(
+                lambda position: self._option_inputs_or_error(position, market_details, today), positions))
+
+        inputs = [(i, x) for i, (x, _) in enumerate(gathered) if x is not None]
+        errors = {i: error for i, (x, error) in enumerate(gathered) if x is None}
+
+        calculations = {}
+        if inputs:
+            batch = PositionBatch.from_inputs(positions, inputs)
+            s, k, t, market_price = batch.s, batch.k, batch.t, batch.market_price
+            is_call, is_buy = batch.is_call, batch.is_buy
+            interest_rate = 0  # Using 0% as default risk-free rate
+
+            # Reuse last poll's volatility when an option's inputs are unchanged and
+            # start Newton from it otherwise, which typically converges in 2-3 steps;
+            # NaN leaves new options to the solver's closed-form initial guess
+            keys = batch.epic
+            solver_inputs = list(zip(s.tolist(), k.tolist(), t.tolist(), market_price.tolist()))
+            previous = [self._iv_warm_start.get(key) for key in keys]
+            reuse = np.array([p is not None and p[0] == x for p, x in zip(previous, solver_inputs)])
+            initial_vol = np.array([p[1] if p is not None else math.nan for p in previous])
+
+            # Prices outside the no-arbitrage bounds (e.g. a deep ITM mid below intrinsic)
+            # have no implied volatility; skip them instead of letting the solver try
+            lower, upper = get_price_bounds_vec(s, k, t, interest_rate, is_call)
+            skipped = (market_price <= lower) | (market_price >= upper)
+            n_skipped = int(skipped.sum())
+            if n_skipped:
+                self.iv_skipped_counter += n_skipped
+                logger.debug("Skipping IV for %d positions priced outside no-arbitrage bounds", n_skipped)
+
+            volatility = initial_vol.copy()
+            converged = reuse & ~np.isnan(initial_vol) & ~skipped  # failed solves are reused as failures
+            solve = ~reuse & ~skipped
+            if solve.any():
+                volatility[solve], converged[solve] = calculate_implied_volatility_vec(
+                    s=s[solve], k=k[solve], t=t[solve], r=interest_rate,
+                    market_price=market_price[solve], is_call=is_call[solve],
+                    initial_vol=initial_vol[solve])
+
+            self._iv_warm_start = {
+                key: (x, float(v) if ok else math.nan)
+                for key, x, v, ok in zip(keys, solver_inputs, volatility, converged)
+            }
+            if not converged.all():
+                failed = int((~converged & ~skipped).sum())
+                if failed:
+                    logger.warning("Failed to calculate IV for %d positions", failed)
+                volatility = np.where(converged, volatility, 0.20)  # Default to 20% if IV calculation fails
+
+            delta = get_delta_vec(s, k, t, volatility, interest_rate, is_call, is_buy)
+
+            # Back to one dict per position only at the API boundary
+            calculations = {
+                i: {
+                    'delta': d,
+                    'underlying_price': s_j,
+                    'strike_price': k_j,
+                    'time_to_expiry': t_j,
+                    'volatility': v,
+                    'interest_rate': interest_rate
                 }
-            '''
-            processed_positions.append(processed_position)               
+                for i, d, s_j, k_j, t_j, v in zip(batch.index.tolist(), delta.tolist(), s.tolist(),
+                                                  k.tolist(), t.tolist(), volatility.tolist())
+            }
+
+        processed_positions = [
+            {**position, 'calculations': calculations.get(i) or {'error': errors[i]}}
+            for i, position in enumerate(positions)
+        ]
 
         return {"positions": processed_positions}
@@ -1,80 +1,116 @@
 import logging
+import pandas as pd
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s'
-)
 logger = logging.getLogger(__name__)
 
+# Columns of the table returned by format_positions
+POSITION_COLUMNS = [
+    # Market information
+    "instrument", "epic", "expiry", "bid", "offer", "high", "low", "change",
+    # Position details
+    "deal_id", "direction", "deal_size", "contract_size", "open_level",
+    "currency", "controlled_risk", "created_date",
+    # Option calculations
+    "delta", "underlying_price", "strike_price", "days_to_expiry",
+    "volatility", "interest_rate", "error"
+]
+
+NUMERIC_COLUMNS = [
+    "bid", "offer", "high", "low", "change", "deal_size", "contract_size",
+    "open_level", "delta", "underlying_price", "strike_price", "days_to_expiry",
+    "volatility", "interest_rate"
+]
+
 def format_positions(positions_data):
-    """Format the positions data for better readability"""
+    """
+    Format the positions data as a table with one row per position
+
+    Percentages (change, volatility, interest_rate) are expressed in percent.
+    Returns an empty table when there are no valid positions.
+    """
+    empty = pd.DataFrame(columns=POSITION_COLUMNS)
     try:
         if not positions_data:
             logger.warning("Empty positions data received")
-            return {"message": "No positions found"}
+            return empty
         
         if not isinstance(positions_data, dict):
             raise TypeError("Positions data must be a dictionary")
                 
         if 'positions' not in positions_data:
             logger.warning("No 'positions' key found in data")
-            return {"message": "No positions found"}
+            return empty
+
+        rows = []
+        skipped = 0
 
-        formatted_positions = []
-        
         for position in positions_data['positions']:
             try:
-                formatted_position = {
+                market = position['market']
+                details = position['position']
+                row = {
                     # Market information
-                    "instrument": position['market']['instrumentName'],
-                    "epic": position['market']['epic'],
-                    "expiry": position['market']['expiry'],
-                    "bid": position['market']['bid'],
-                    "offer": position['market']['offer'],
-                    "high": position['market']['high'],
-                    "low": position['market']['low'],
-                    "change": f"{position['market']['percentageChange']}%",
+                    "instrument": market['instrumentName'],
+                    "epic": market['epic'],
+                    "expiry": market['expiry'],
+                    "bid": market['bid'],
+                    "offer": market['offer'],
+                    "high": market['high'],
+                    "low": market['low'],
+                    "change": market['percentageChange'],
 
                     # Position details
-                    "deal_id": position['position']['dealId'],
-                    "direction": position['position']['direction'],
-                    "deal_size": position['position']['dealSize'],
-                    "contract_size": position['position']['contractSize'],
-                    "open_level": position['position']['openLevel'],
-                    "currency": position['position']['currency'],
-                    "controlled_risk": position['position']['controlledRisk'],
-                    "created_date": position['position']['createdDate']
+                    "deal_id": details['dealId'],
+                    "direction": details['direction'],
+                    "deal_size": details['dealSize'],
+                    "contract_size": details['contractSize'],
+                    "open_level": details['openLevel'],
+                    "currency": details['currency'],
+                    "controlled_risk": details['controlledRisk'],
+                    "created_date": details['createdDate']
                 }
 
                 # Add calculations if present (for options)
-                if 'calculations' in position:
-                    if 'error' in position['calculations']:
-                        formatted_position['calculations'] = {
-                            'error': position['calculations']['error']
-                        }
+                calculations = position.get('calculations')
+                if calculations:
+                    if 'error' in calculations:
+                        row['error'] = calculations['error']
                     else:
-                        formatted_position['calculations'] = {
-                            'delta': round(position['calculations']['delta'], 4),
-                            'underlying_price': position['calculations']['underlying_price'],
-                            'strike_price': position['calculations']['strike_price'],
-                            'time_to_expiry': round(position['calculations']['time_to_expiry'] * 365),  # Convert back to days
-                            'volatility': f"{round(position['calculations']['volatility'] * 100, 2)}%",
-                            'interest_rate': f"{round(position['calculations']['interest_rate'] * 100, 2)}%"
-                        }
+                        # Raw values; scaled and rounded column-wise below
+                        row.update({
+                            'delta': calculations['delta'],
+                            'underlying_price': calculations['underlying_price'],
+                            'strike_price': calculations['strike_price'],
+                            'days_to_expiry': calculations['time_to_expiry'],
+                            'volatility': calculations['volatility'],
+                            'interest_rate': calculations['interest_rate']
+                        })
 
-                formatted_positions.append(formatted_position)
+                rows.append(row)
 
             except (KeyError, TypeError, ValueError) as e:
-                logger.error(f"Error processing position: {str(e)}")
-                continue  # Skip this position and continue with the next one
+                # Skip this position and continue with the next one; reported once below
+                if not skipped:
+                    first_error = e
+                skipped += 1
+                continue
+
+        if skipped:
+            logger.error("Skipped %d positions that could not be formatted (first error: %r)",
+                         skipped, first_error)
 
-        if not formatted_positions:
+        if not rows:
             logger.warning("No positions were successfully processed")
-            return {"message": "No valid positions found"}
+            return empty
 
-        return {"positions": formatted_positions}
+        df = pd.DataFrame.from_records(rows, columns=POSITION_COLUMNS)
+        # Coerce per cell so one malformed value becomes NaN rather than losing the table
+        df[NUMERIC_COLUMNS] = df[NUMERIC_COLUMNS].apply(pd.to_numeric, errors="coerce").astype("float64")
+        df['delta'] = df['delta'].round(4)
+        df['days_to_expiry'] = (df['days_to_expiry'] * 365).round()
+        df[['volatility', 'interest_rate']] = (df[['volatility', 'interest_rate']] * 100).round(2)
+        return df
 
-    except Exception as e:
-        logger.error(f"Unexpected error in format_positions: {str(e)}")
-        return {"message": f"Error processing positions data: {str(e)}"}
\ No newline at end of file
+    except (KeyError, TypeError, ValueError) as e:
+        logger.error("Unexpected error in format_positions: %s", e)
+        return empty